@@ -1,64 +1,154 @@
+"""
+Breadth first search, expanding the graph one frontier (all nodes at the same distance) at a time.
+
+Top-down steps visit the neighbors of the frontier nodes. With direction_optimizing, the search switches to bottom-up
+steps when the frontier gets large: every unvisited node then checks whether one of its in-neighbors is in the
+frontier and stops at the first one, which skips most edges on low diameter graphs. The switch is made when the
+frontier has more than 1 / alpha of the edges of the unvisited nodes, and the search switches back to top-down when
+the frontier has less than 1 / beta of the nodes (Beamer, Asanovic & Patterson, 2012).
+"""
 from src.graph_algorithms.graph import Graph, TraverseStates
 
 
 class BreadthFirstSearch:
-    def __init__(self, graph: Graph):
+    def __init__(self, graph: Graph, direction_optimizing=False, alpha=14, beta=24):
+        """
+
+        :param graph: Graph (or a graph with the same get_nodes/get_node_neighbors methods, like CSRGraph)
+        :param direction_optimizing: bool, whether to switch to bottom-up steps on large frontiers
+        :param alpha: int, switch to bottom-up when frontier edges > unvisited edges / alpha
+        :param beta: int, switch back to top-down when frontier nodes < nodes / beta
+        """
         self.graph = graph
+        self.direction_optimizing = direction_optimizing
+        self.alpha = alpha
+        self.beta = beta
         self.start_node = None
         self.predecessor = {}
         self.traversed = {}
         self.distances = {}
-        self.queue = []
-        self.graph_traversed = True
+        self.frontier = []
+        self.in_neighbors = None
+        self.in_neighbors_version = None
+        self.graph_traversed = False
 
-    def traverse_graph(self, start_node):
-        self.start_node = start_node
+    def _get_in_neighbors(self, node):
+        """
+        Nodes with an edge to node, for bottom-up steps. Built once per graph version for directed graphs (see
+        traverse_graph)
+        """
+        if not self.graph.directed:
+            return self.graph.get_node_neighbors(node)
+        if self.in_neighbors is None:
+            self.in_neighbors = {other: [] for other in self.graph.get_nodes()}
+            for other in self.graph.get_nodes():
+                for neighbor in self.graph.get_node_neighbors(other):
+                    self.in_neighbors[neighbor].append(other)
+        return self.in_neighbors[node]
+
+    def _top_down_step(self, distance, target_node):
+        next_frontier = []
+        for node in self.frontier:
+            for neighbor in self.graph.get_node_neighbors(node):
+                if self.traversed[neighbor] == TraverseStates.NOT_VISITED:
+                    self.predecessor[neighbor] = node
+                    self.distances[neighbor] = distance
+                    self.traversed[neighbor] = TraverseStates.VISITED
+                    next_frontier.append(neighbor)
+                    if neighbor == target_node:
+                        return next_frontier
+        return next_frontier
+
+    def _bottom_up_step(self, distance, target_node):
+        next_frontier = []
         for node in self.graph.get_nodes():
-            self.predecessor[node] = -1
-            self.distances[node] = float("inf")
-            self.traversed[node] = TraverseStates.NOT_VISITED
+            if self.traversed[node] != TraverseStates.NOT_VISITED:
+                continue
+            for neighbor in self._get_in_neighbors(node):
+                if self.distances[neighbor] == distance - 1:
+                    self.predecessor[node] = neighbor
+                    self.distances[node] = distance
+                    self.traversed[node] = TraverseStates.VISITED
+                    next_frontier.append(node)
+                    if node == target_node:
+                        return next_frontier
+                    break
+        return next_frontier
 
-        self.traversed[start_node] = TraverseStates.VISITED
-        self.distances[start_node] = 0
+    def traverse_graph(self, start_node, target_node=None):
+        """
+        Walks the graph breadth first from start_node, filling self.predecessor and self.distances.
 
-        self.queue = []
-        self.queue.insert(0, start_node)
+        :param start_node: node label, or a list/tuple/set of labels for a multi-source search (distances are then to
+            the nearest start node)
+        :param target_node: node label, if given the search stops as soon as target_node is reached
+        """
+        start_nodes = list(start_node) if isinstance(start_node, (list, tuple, set)) else [start_node]
+        self.start_node = start_node
+        # Graph.add_edge and Graph.remove_edge increment the version, the in-neighbors are then rebuilt when needed
+        version = getattr(self.graph, 'version', 0)
+        if version != self.in_neighbors_version:
+            self.in_neighbors = None
+            self.in_neighbors_version = version
+        nodes = self.graph.get_nodes()
+        self.predecessor = dict.fromkeys(nodes, -1)
+        self.distances = dict.fromkeys(nodes, float("inf"))
+        self.traversed = dict.fromkeys(nodes, TraverseStates.NOT_VISITED)
 
-        while len(self.queue) > 0:
-            current_node = self.queue.pop()
-            for neighbor in self.graph.get_node_neighbors(current_node):
-                if self.traversed[neighbor] == TraverseStates.NOT_VISITED:
-                    self.predecessor[neighbor] = current_node
-                    self.distances[neighbor] = self.distances[current_node] + 1
-                    self.traversed[neighbor] = TraverseStates.VISITED
+        for node in start_nodes:
+            self.traversed[node] = TraverseStates.VISITED
+            self.distances[node] = 0
+        self.frontier = list(dict.fromkeys(start_nodes))
+
+        if self.direction_optimizing:
+            degrees = {node: len(self.graph.get_node_neighbors(node)) for node in nodes}
+            unvisited_edges = sum(degrees.values()) - sum(degrees[node] for node in self.frontier)
+        bottom_up = False
+        distance = 0
+        while len(self.frontier) > 0:
+            if target_node is not None and self.distances[target_node] != float("inf"):
+                break
+            distance += 1
+            if self.direction_optimizing:
+                frontier_edges = sum(degrees[node] for node in self.frontier)
+                if not bottom_up and frontier_edges > unvisited_edges / self.alpha:
+                    bottom_up = True
+                elif bottom_up and len(self.frontier) < len(nodes) / self.beta:
+                    bottom_up = False
+            for node in self.frontier:
+                self.traversed[node] = TraverseStates.ALL_NEIGHBOURS_VISITED
 
-                    self.queue.insert(0, neighbor)
+            if bottom_up:
+                self.frontier = self._bottom_up_step(distance, target_node)
+            else:
+                self.frontier = self._top_down_step(distance, target_node)
+            if self.direction_optimizing:
+                unvisited_edges -= sum(degrees[node] for node in self.frontier)
+        self.graph_traversed = True
 
-            self.traversed[current_node] = TraverseStates.ALL_NEIGHBOURS_VISITED
-            self.graph_traversed = True
+    def get_distance(self, target_node):
+        """Number of edges from the (nearest) start node to target_node, inf when it wasn't reached"""
+        return self.distances[target_node]
 
     def find_path_to_node(self, target_node, start_node=None):
         """
         Given a target node, find the path from the start node to that target node.
-        Works by recursively looking up the predecessor nodes, starting at the target node and stopping when
+        Works by looking up the predecessor nodes, starting at the target node and stopping when
         the start node is reached. The returned list contains the starting node and the nodes that need to be
         passed to get to the target node.
 
         :param target_node: str, The end node
-        :param start_node: str, Root node, defaults to self.start_node
-        :return: list, [start_node, node_1, node_2, ..., node_n, target_node]
+        :param start_node: str, Root node, defaults to the start node the target node was reached from
+        :return: list, [start_node, node_1, node_2, ..., node_n, target_node], None if target_node wasn't reached
         """
         if self.graph_traversed:
-            start_found = False
-            start_node = start_node if start_node else self.start_node
-            path = []
+            if self.distances[target_node] == float("inf"):
+                return None
+            path = [target_node]
             current_node = target_node
-            while not start_found:
-                path.append(current_node)
+            while current_node != start_node and self.predecessor[current_node] != -1:
                 current_node = self.predecessor[current_node]
-                if current_node == start_node:
-                    start_found = True
-                    path.append(current_node)
+                path.append(current_node)
             path.reverse()
             return path
         else:
@@ -73,9 +163,36 @@ if __name__ == '__main__':
     graph.add_edge('C', 'D')
     graph.add_edge('D', 'E')
     graph.add_edge('B', 'E')
-    depth_first_search = BreadthFirstSearch(graph)
-    depth_first_search.traverse_graph(start_node='A')
+    breadth_first_search = BreadthFirstSearch(graph)
+    breadth_first_search.traverse_graph(start_node='A')
+
+    assert breadth_first_search.find_path_to_node('E') == ['A', 'B', 'E']
+    assert breadth_first_search.find_path_to_node('D') == ['A', 'B', 'C', 'D']
+    assert breadth_first_search.find_path_to_node('E', start_node='B') == ['B', 'E']
+
+    breadth_first_search.traverse_graph(['A', 'D'])
+    assert breadth_first_search.find_path_to_node('E') == ['D', 'E']
+    assert breadth_first_search.get_distance('B') == 1
+
+    breadth_first_search.traverse_graph('A', target_node='B')
+    assert breadth_first_search.find_path_to_node('B') == ['A', 'B']
+    assert breadth_first_search.find_path_to_node('D') is None
+
+    directed_graph = Graph(200, directed=True)
+    for node in range(1, 200):
+        directed_graph.add_edge(node // 3, node)
+        directed_graph.add_edge(node, (node * 7) % 200)
+    top_down = BreadthFirstSearch(directed_graph)
+    top_down.traverse_graph(0)
+    direction_optimizing = BreadthFirstSearch(directed_graph, direction_optimizing=True)
+    direction_optimizing.traverse_graph(0)
+    assert direction_optimizing.distances == top_down.distances
+    path = direction_optimizing.find_path_to_node(199)
+    assert path[0] == 0 and len(path) == top_down.distances[199] + 1
+    assert all(directed_graph.edge_exists(node, next_node) for node, next_node in zip(path, path[1:]))
 
-    assert depth_first_search.find_path_to_node('E') == ['A', 'B', 'E']
-    assert depth_first_search.find_path_to_node('D') == ['A', 'B', 'C', 'D']
-    assert depth_first_search.find_path_to_node('E', start_node='B') == ['B', 'E']
+    # Edges added after a traversal are seen by the next traversal of the same instance
+    directed_graph.add_edge(3, 199)
+    top_down.traverse_graph(0)
+    direction_optimizing.traverse_graph(0)
+    assert direction_optimizing.distances == top_down.distances and direction_optimizing.get_distance(199) == 3
@@ -0,0 +1,328 @@
+"""
+Immutable graph in compressed sparse row (CSR) format.
+Node labels are interned to dense integer ids 0..n-1. The neighbors of node i are
+targets[offsets[i]:offsets[i + 1]], with the matching edge weights in weights. All three are flat typed arrays, which
+takes 12 bytes per edge (32 bit target id and 64 bit weight) instead of a dict entry per edge.
+"""
+from array import array
+
+from src.graph_algorithms.graph import Graph
+
+NOT_VISITED = 0
+VISITED = 1
+ALL_NEIGHBOURS_VISITED = 2
+
+
+def id_typecode(n_nodes):
+    """Array typecode for node ids: 32 bit when all ids fit, which halves the size of the targets array"""
+    return 'i' if n_nodes < 1 << 31 else 'q'
+
+
+class CSRGraph:
+    def __init__(self, labels, offsets, targets, weights, directed=False):
+        """
+        Use CSRGraph.from_graph or CSRGraph.from_edges to create a CSRGraph.
+
+        :param labels: list, node label of every node id
+        :param offsets: array, n + 1 offsets into targets
+        :param targets: array, node ids of the edge targets, grouped by source node
+        :param weights: array, weight of every edge in targets
+        :param directed: bool, whether the graph is directed
+        """
+        self.labels = labels
+        self.ids = {label: node_id for node_id, label in enumerate(labels)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+
+    @staticmethod
+    def from_graph(graph: Graph):
+        """Converts a dict based Graph to a CSRGraph, with node ids in the order of graph.get_nodes()"""
+        labels = list(graph.get_nodes())
+        ids = {label: node_id for node_id, label in enumerate(labels)}
+        offsets = array('q', [0])
+        targets = array(id_typecode(len(labels)))
+        weights = array('d')
+        for label in labels:
+            for neighbor, weight in graph.graph[label].items():
+                targets.append(ids[neighbor])
+                weights.append(weight)
+            offsets.append(len(targets))
+        return CSRGraph(labels, offsets, targets, weights, graph.directed)
+
+    @staticmethod
+    def from_edges(edges, directed=False, nodes=None):
+        """
+        Builds a CSRGraph from an iterable of (node, target_node) or (node, target_node, weight) edges.
+        The edges are first collected in flat arrays, then placed in CSR order with a counting sort on the source id.
+        For undirected graphs every edge is stored in both directions. Duplicate edges are kept.
+
+        :param edges: Iterable with edge tuples
+        :param directed: bool, whether the graph is directed
+        :param nodes: Iterable with node labels, to fix the node id order and include nodes without edges
+        :return: CSRGraph
+        """
+        labels = list(nodes) if nodes is not None else []
+        ids = {label: node_id for node_id, label in enumerate(labels)}
+        sources = array('q')
+        targets = array('q')
+        weights = array('d')
+        for edge in edges:
+            node, target_node = edge[0], edge[1]
+            weight = edge[2] if len(edge) > 2 else 0
+            for label in (node, target_node):
+                if label not in ids:
+                    ids[label] = len(labels)
+                    labels.append(label)
+            sources.append(ids[node])
+            targets.append(ids[target_node])
+            weights.append(weight)
+            if not directed:
+                sources.append(ids[target_node])
+                targets.append(ids[node])
+                weights.append(weight)
+
+        n = len(labels)
+        offsets = array('q', bytes(8 * (n + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        positions = array('q', offsets[:n])
+        sorted_targets = array(id_typecode(n), bytes(array(id_typecode(n)).itemsize * len(targets)))
+        sorted_weights = array('d', bytes(8 * len(weights)))
+        for source, target, weight in zip(sources, targets, weights):
+            position = positions[source]
+            sorted_targets[position] = target
+            sorted_weights[position] = weight
+            positions[source] = position + 1
+        return CSRGraph(labels, offsets, sorted_targets, sorted_weights, directed)
+
+    def transpose(self):
+        """CSRGraph with all edges reversed (the graph itself for undirected graphs), gives the in-neighbors of nodes"""
+        if not self.directed:
+            return self
+        n = self.n_nodes()
+        sources = array('q')
+        for node_id in range(n):
+            sources.extend([node_id] * (self.offsets[node_id + 1] - self.offsets[node_id]))
+        edges = zip(self.targets, sources, self.weights)
+        transposed = CSRGraph.from_edges(edges, directed=True, nodes=range(n))
+        transposed.labels = self.labels
+        transposed.ids = self.ids
+        return transposed
+
+    def n_nodes(self):
+        return len(self.labels)
+
+    def n_edges(self):
+        """Number of stored (directed) edges, undirected edges count twice"""
+        return len(self.targets)
+
+    def get_nodes(self) -> list:
+        """Returns all node labels in the graph"""
+        return self.labels
+
+    def node_id(self, label):
+        return self.ids[label]
+
+    def neighbor_ids(self, node_id):
+        """Node ids of the neighbors of node_id, as a slice of the targets array"""
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def get_node_neighbors(self, node) -> list:
+        """Get all neighbor node labels of node (label), same as Graph.get_node_neighbors"""
+        return [self.labels[neighbor] for neighbor in self.neighbor_ids(self.ids[node])]
+
+    def get_weighted_neighbors(self, node):
+        """Get (neighbor, weight) pairs for all edges of node (label), same as Graph.get_weighted_neighbors"""
+        node_id = self.ids[node]
+        start, end = self.offsets[node_id], self.offsets[node_id + 1]
+        return [(self.labels[self.targets[position]], self.weights[position]) for position in range(start, end)]
+
+    def edge_exists(self, node, target_node):
+        """Check if the edge (node, target_node) exists"""
+        return self.get_edge_weight(node, target_node) is not None
+
+    def get_edge_weight(self, node, target_node):
+        """If edge (node, target_node) exists, returns weight of the edge, otherwise returns None"""
+        node_id = self.ids[node]
+        target_id = self.ids[target_node]
+        for position in range(self.offsets[node_id], self.offsets[node_id + 1]):
+            if self.targets[position] == target_id:
+                return self.weights[position]
+        return None
+
+
+class CSRBreadthFirstSearch:
+    def __init__(self, graph: CSRGraph, direction_optimizing=False, alpha=14, beta=24):
+        """
+        Breadth first search over a CSRGraph, with the same frontier-at-a-time and direction optimizing strategy as
+        BreadthFirstSearch. Traversal state is kept in flat buffers indexed by node id: traversed is a bytearray with
+        NOT_VISITED, VISITED or ALL_NEIGHBOURS_VISITED per node, predecessor and distances are arrays (-1 for no
+        predecessor / not reached).
+        """
+        self.graph = graph
+        self.direction_optimizing = direction_optimizing
+        self.alpha = alpha
+        self.beta = beta
+        self.start_node = None
+        self.traversed = bytearray()
+        self.predecessor = array('q')
+        self.distances = array('q')
+        self.transposed = None
+        self.graph_traversed = False
+
+    def _top_down_step(self, frontier, distance, target_id):
+        offsets = self.graph.offsets
+        targets = self.graph.targets
+        traversed = self.traversed
+        predecessor = self.predecessor
+        distances = self.distances
+        next_frontier = array('q')
+        for current in frontier:
+            for position in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[position]
+                if traversed[neighbor] == NOT_VISITED:
+                    traversed[neighbor] = VISITED
+                    predecessor[neighbor] = current
+                    distances[neighbor] = distance
+                    next_frontier.append(neighbor)
+                    if neighbor == target_id:
+                        return next_frontier
+        return next_frontier
+
+    def _bottom_up_step(self, distance, target_id):
+        if self.transposed is None:
+            self.transposed = self.graph.transpose()
+        offsets = self.transposed.offsets
+        targets = self.transposed.targets
+        traversed = self.traversed
+        predecessor = self.predecessor
+        distances = self.distances
+        next_frontier = array('q')
+        for node_id in range(len(traversed)):
+            if traversed[node_id] != NOT_VISITED:
+                continue
+            for position in range(offsets[node_id], offsets[node_id + 1]):
+                neighbor = targets[position]
+                if distances[neighbor] == distance - 1:
+                    traversed[node_id] = VISITED
+                    predecessor[node_id] = neighbor
+                    distances[node_id] = distance
+                    next_frontier.append(node_id)
+                    if node_id == target_id:
+                        return next_frontier
+                    break
+        return next_frontier
+
+    def traverse_graph(self, start_node, target_node=None):
+        """
+        Walks the graph breadth first from start_node (label, or a list/tuple/set of labels for a multi-source search).
+        If target_node is given, the search stops as soon as it is reached.
+        """
+        n = self.graph.n_nodes()
+        offsets = self.graph.offsets
+        start_nodes = list(start_node) if isinstance(start_node, (list, tuple, set)) else [start_node]
+        self.start_node = start_node
+        self.traversed = bytearray(n)
+        self.predecessor = array('q', [-1]) * n
+        self.distances = array('q', [-1]) * n
+        target_id = self.graph.node_id(target_node) if target_node is not None else -1
+
+        frontier = array('q')
+        for node in start_nodes:
+            start_id = self.graph.node_id(node)
+            if self.traversed[start_id] == NOT_VISITED:
+                self.traversed[start_id] = VISITED
+                self.distances[start_id] = 0
+                frontier.append(start_id)
+
+        unvisited_edges = self.graph.n_edges() - sum(offsets[i + 1] - offsets[i] for i in frontier)
+        bottom_up = False
+        distance = 0
+        while len(frontier) > 0 and not (target_id >= 0 and self.traversed[target_id] != NOT_VISITED):
+            distance += 1
+            if self.direction_optimizing:
+                frontier_edges = sum(offsets[i + 1] - offsets[i] for i in frontier)
+                if not bottom_up and frontier_edges > unvisited_edges / self.alpha:
+                    bottom_up = True
+                elif bottom_up and len(frontier) < n / self.beta:
+                    bottom_up = False
+            for current in frontier:
+                self.traversed[current] = ALL_NEIGHBOURS_VISITED
+
+            if bottom_up:
+                frontier = self._bottom_up_step(distance, target_id)
+            else:
+                frontier = self._top_down_step(frontier, distance, target_id)
+            if self.direction_optimizing:
+                unvisited_edges -= sum(offsets[i + 1] - offsets[i] for i in frontier)
+        self.graph_traversed = True
+
+    def get_distance(self, target_node):
+        """Number of edges from the start node to target_node, inf when it can't be reached"""
+        distance = self.distances[self.graph.node_id(target_node)]
+        return distance if distance >= 0 else float("inf")
+
+    def find_path_to_node(self, target_node):
+        """
+        Given a target node, find the path from the start node to that target node by following the predecessors.
+
+        :param target_node: Label of the end node
+        :return: list, [start_node, node_1, node_2, ..., node_n, target_node], None if target_node can't be reached
+        """
+        if not self.graph_traversed:
+            print("Graph not traversed yet. Call the traverse_graph function first.")
+            return None
+        current = self.graph.node_id(target_node)
+        if self.distances[current] < 0:
+            return None
+        path = []
+        while current != -1:
+            path.append(self.graph.labels[current])
+            current = self.predecessor[current]
+        path.reverse()
+        return path
+
+
+if __name__ == '__main__':
+    graph = Graph(['A', 'B', 'C', 'D', 'E'], directed=False)
+    graph.add_edge('A', 'B', 3)
+    graph.add_edge('B', 'C')
+    graph.add_edge('C', 'D')
+    graph.add_edge('D', 'E')
+    graph.add_edge('B', 'E')
+    csr_graph = CSRGraph.from_graph(graph)
+    assert csr_graph.n_edges() == 10
+    assert sorted(csr_graph.get_node_neighbors('B')) == ['A', 'C', 'E']
+    assert csr_graph.get_edge_weight('B', 'A') == 3
+
+    breadth_first_search = CSRBreadthFirstSearch(csr_graph)
+    breadth_first_search.traverse_graph('A')
+    assert breadth_first_search.find_path_to_node('E') == ['A', 'B', 'E']
+    assert breadth_first_search.find_path_to_node('D') == ['A', 'B', 'C', 'D']
+    assert breadth_first_search.get_distance('D') == 3
+
+    edge_graph = CSRGraph.from_edges([(0, 1), (1, 2, 2.5), (5, 6)], directed=True, nodes=range(7))
+    assert edge_graph.get_node_neighbors(1) == [2]
+    assert edge_graph.get_edge_weight(1, 2) == 2.5
+    breadth_first_search = CSRBreadthFirstSearch(edge_graph)
+    breadth_first_search.traverse_graph(0)
+    assert breadth_first_search.find_path_to_node(2) == [0, 1, 2]
+    assert breadth_first_search.find_path_to_node(6) is None
+
+    directed_graph = Graph(200, directed=True)
+    for node in range(1, 200):
+        directed_graph.add_edge(node // 3, node)
+        directed_graph.add_edge(node, (node * 7) % 200)
+    csr_graph = CSRGraph.from_graph(directed_graph)
+    top_down = CSRBreadthFirstSearch(csr_graph)
+    top_down.traverse_graph(0)
+    direction_optimizing = CSRBreadthFirstSearch(csr_graph, direction_optimizing=True)
+    direction_optimizing.traverse_graph(0)
+    assert direction_optimizing.distances == top_down.distances
+    direction_optimizing.traverse_graph([5, 6], target_node=18)
+    assert direction_optimizing.find_path_to_node(18) == [6, 18]
@@ -1,5 +1,168 @@
+"""
+Depth first search with an explicit stack, so the depth of the graph is not limited by the recursion limit.
+depth_first_events walks the graph and yields an event for every step, the other functions (DepthFirstSearch,
+topological_sort, find_cycle and strongly_connected_components) are built on these events. They work on any graph with
+get_nodes and get_node_neighbors methods, like Graph and CSRGraph.
+"""
 from src.graph_algorithms.graph import Graph, TraverseStates
 
+PRE_ORDER = 'pre'
+POST_ORDER = 'post'
+BACK_EDGE = 'back'
+CROSS_EDGE = 'cross'
+
+
+def depth_first_events(graph, start_nodes=None, get_neighbors=None):
+    """
+    Walks the graph depth first and yields (event, node, other) tuples:
+    - (PRE_ORDER, node, parent) when node is discovered, parent is None for start nodes
+    - (BACK_EDGE, node, neighbor) for an edge to a node that is still on the stack (VISITED)
+    - (CROSS_EDGE, node, neighbor) for an edge to a node that is done (ALL_NEIGHBOURS_VISITED), forward or cross edge
+    - (POST_ORDER, node, parent) when all neighbors of node are visited
+    Every node is discovered once, so later start nodes only walk the part of the graph that wasn't reached yet.
+
+    :param graph: Graph or a graph with the same get_nodes/get_node_neighbors methods
+    :param start_nodes: Iterable with start nodes, defaults to all nodes of the graph
+    :param get_neighbors: Function, node -> neighbors, defaults to graph.get_node_neighbors
+    """
+    get_neighbors = get_neighbors if get_neighbors else graph.get_node_neighbors
+    start_nodes = start_nodes if start_nodes is not None else graph.get_nodes()
+    traversed = {}
+    for start_node in start_nodes:
+        if start_node in traversed:
+            continue
+        traversed[start_node] = TraverseStates.VISITED
+        yield PRE_ORDER, start_node, None
+        stack = [(start_node, None, iter(get_neighbors(start_node)))]
+        while len(stack) > 0:
+            node, parent, neighbors = stack[-1]
+            for neighbor in neighbors:
+                state = traversed.get(neighbor, TraverseStates.NOT_VISITED)
+                if state == TraverseStates.NOT_VISITED:
+                    traversed[neighbor] = TraverseStates.VISITED
+                    yield PRE_ORDER, neighbor, node
+                    stack.append((neighbor, node, iter(get_neighbors(neighbor))))
+                    break
+                yield (BACK_EDGE if state == TraverseStates.VISITED else CROSS_EDGE), node, neighbor
+            else:
+                stack.pop()
+                traversed[node] = TraverseStates.ALL_NEIGHBOURS_VISITED
+                yield POST_ORDER, node, parent
+
+
+def post_order(graph, start_nodes=None):
+    """Yields the nodes in depth first post-order"""
+    for event, node, _ in depth_first_events(graph, start_nodes):
+        if event == POST_ORDER:
+            yield node
+
+
+def topological_sort(graph) -> list:
+    """
+    Orders the nodes of a directed acyclic graph so that every edge goes from an earlier to a later node
+    (reversed post-order). Raises a ValueError when the graph has a cycle.
+    """
+    order = []
+    for event, node, other in depth_first_events(graph):
+        if event == BACK_EDGE:
+            raise ValueError(f"Graph has a cycle through the edge ({node}, {other}), it can't be sorted topologically")
+        if event == POST_ORDER:
+            order.append(node)
+    order.reverse()
+    return order
+
+
+def find_cycle(graph):
+    """
+    Finds a cycle in the graph. In undirected graphs, going back over the edge a node was discovered through is not a
+    cycle.
+
+    :return: list, [node_1, node_2, ..., node_n, node_1] with the nodes of a cycle, None if the graph has no cycle
+    """
+    predecessor = {}
+    for event, node, other in depth_first_events(graph):
+        if event == PRE_ORDER:
+            predecessor[node] = other
+        elif event == BACK_EDGE and (graph.directed or predecessor[node] != other or node == other):
+            cycle = [node]
+            while cycle[-1] != other:
+                cycle.append(predecessor[cycle[-1]])
+            cycle.reverse()
+            cycle.append(other)
+            return cycle
+    return None
+
+
+def has_cycle(graph) -> bool:
+    return find_cycle(graph) is not None
+
+
+def _tarjan(graph):
+    """
+    Tarjan: a node is the root of a component when no node below it in the depth first tree has an edge to a node
+    that was discovered earlier and is still on the component stack.
+    """
+    index = {}
+    lowlink = {}
+    component_stack = []
+    on_stack = set()
+    for event, node, other in depth_first_events(graph):
+        if event == PRE_ORDER:
+            index[node] = lowlink[node] = len(index)
+            component_stack.append(node)
+            on_stack.add(node)
+        elif event in (BACK_EDGE, CROSS_EDGE):
+            if other in on_stack:
+                lowlink[node] = min(lowlink[node], index[other])
+        else:
+            if lowlink[node] == index[node]:
+                component = []
+                while len(component) == 0 or component[-1] != node:
+                    component.append(component_stack.pop())
+                    on_stack.discard(component[-1])
+                yield component
+            if other is not None:
+                lowlink[other] = min(lowlink[other], lowlink[node])
+
+
+def _kosaraju(graph):
+    """
+    Kosaraju: walks the transposed graph from the nodes in reversed post-order of the graph, every walk finds one
+    component.
+    """
+    if hasattr(graph, 'transpose'):
+        get_in_neighbors = graph.transpose().get_node_neighbors
+    else:
+        in_neighbors = {node: [] for node in graph.get_nodes()}
+        for node in graph.get_nodes():
+            for neighbor in graph.get_node_neighbors(node):
+                in_neighbors[neighbor].append(node)
+        get_in_neighbors = in_neighbors.__getitem__
+
+    order = list(post_order(graph))
+    order.reverse()
+    component = []
+    for event, node, parent in depth_first_events(graph, order, get_in_neighbors):
+        if event == PRE_ORDER:
+            component.append(node)
+        elif event == POST_ORDER and parent is None:
+            yield component
+            component = []
+
+
+def strongly_connected_components(graph, algorithm='tarjan'):
+    """
+    Yields the strongly connected components (lists of nodes that can all reach each other) of a directed graph.
+    Tarjan yields the components in reversed topological order, Kosaraju in topological order.
+
+    :param algorithm: str, 'tarjan' (one pass) or 'kosaraju' (two passes, builds the transposed graph)
+    """
+    if algorithm == 'tarjan':
+        return _tarjan(graph)
+    if algorithm == 'kosaraju':
+        return _kosaraju(graph)
+    raise ValueError(f"Unknown algorithm '{algorithm}', choose from 'tarjan' or 'kosaraju'")
+
 
 class DepthFirstSearch:
     def __init__(self, graph: Graph):
@@ -9,44 +172,35 @@ class DepthFirstSearch:
         self.start_node = None
         self.graph_traversed = False
 
-    def _visit_node(self, node):
-        """
-        Recursive function to visit the node and its neighbors. When a neighbor is found, this function is called
-        with that node.
-        Adds the neighbor to self.predecessor and sets its value to node.
-
-        :param node: str, current node
-        """
-        self.traversed[node] = TraverseStates.VISITED
-        for neighbor in self.graph.get_node_neighbors(node):
-            if self.traversed[neighbor] == TraverseStates.NOT_VISITED:
-                self.predecessor[neighbor] = node
-                self._visit_node(neighbor)
-            self.traversed[node] = TraverseStates.ALL_NEIGHBOURS_VISITED
-
     def traverse_graph(self, start_node):
         """
         Walks the graph starting at start_node. Self.start_node is set, to have a default for the path finding
         function. (Another possibility to find start node(s) would be to find the key(s) where
         self.predecessor[node] == -1)
-        Starts by setting all nodes in the graph to 'not visited', then the recursive '_visit_node' function is called
-        to traverse all nodes and neighbors.
+        Starts by setting all nodes in the graph to 'not visited', then the events of depth_first_events are used
+        to fill self.predecessor and self.traversed.
         Finally, self.graph_traversed is set to true, to indicate self.graph is processed
 
         :param start_node: str, root node from where to walk the graph
         """
         self.start_node = start_node
-        for node in self.graph.get_nodes():
-            self.predecessor[node] = -1
-            self.traversed[node] = TraverseStates.NOT_VISITED
+        nodes = self.graph.get_nodes()
+        self.predecessor = dict.fromkeys(nodes, -1)
+        self.traversed = dict.fromkeys(nodes, TraverseStates.NOT_VISITED)
 
-        self._visit_node(start_node)
+        for event, node, other in depth_first_events(self.graph, [start_node]):
+            if event == PRE_ORDER:
+                self.traversed[node] = TraverseStates.VISITED
+                if other is not None:
+                    self.predecessor[node] = other
+            elif event == POST_ORDER:
+                self.traversed[node] = TraverseStates.ALL_NEIGHBOURS_VISITED
         self.graph_traversed = True
 
     def find_path_to_node(self, target_node, start_node=None):
         """
         Given a target node, find the path from the start node to that target node.
-        Works by recursively looking up the predecessor nodes, starting at the target node and stopping when
+        Works by looking up the predecessor nodes, starting at the target node and stopping when
         the start node is reached. The returned list contains the starting node and the nodes that need to be
         passed to get to the target node.
         NOTE: Depth first search does not necessarily find the *shortest* path from start to target
@@ -85,3 +239,30 @@ if __name__ == '__main__':
     assert depth_first_search.find_path_to_node('E') == ['A', 'B', 'E']
     assert depth_first_search.find_path_to_node('D') == ['A', 'B', 'C', 'D']
     assert depth_first_search.find_path_to_node('D', start_node='B') == ['B', 'C', 'D']
+    assert find_cycle(graph) is None
+    graph.add_edge('D', 'E')
+    assert find_cycle(graph) == ['B', 'C', 'D', 'E', 'B']
+
+    chain = Graph(100000, directed=True)
+    for node in range(99999):
+        chain.add_edge(node, node + 1)
+    assert topological_sort(chain) == list(range(100000))
+    depth_first_search = DepthFirstSearch(chain)
+    depth_first_search.traverse_graph(0)
+    assert len(depth_first_search.find_path_to_node(99999)) == 100000
+    chain.add_edge(99999, 50000)
+    assert find_cycle(chain) == list(range(50000, 100000)) + [50000]
+    try:
+        topological_sort(chain)
+        assert False, "Expected a ValueError for a graph with a cycle"
+    except ValueError:
+        pass
+
+    directed_graph = Graph(8, directed=True)
+    for node, target_node in [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 5), (5, 3), (6, 5), (6, 7)]:
+        directed_graph.add_edge(node, target_node)
+    expected = [[0, 1, 2], [3, 4, 5], [6], [7]]
+    for algorithm in ('tarjan', 'kosaraju'):
+        components = strongly_connected_components(directed_graph, algorithm)
+        assert sorted(sorted(component) for component in components) == expected
+    assert [sorted(component) for component in strongly_connected_components(directed_graph)][0] == [3, 4, 5]
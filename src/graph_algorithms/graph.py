@@ -1,5 +1,7 @@
 from enum import Enum
 
+from src.graph_algorithms.union_find import DisjointSet
+
 
 class TraverseStates(Enum):
     """Helper class for node states during graph traversal"""
@@ -20,6 +22,12 @@ class Graph:
         self.node_labels = []
         self.directed = directed
         self.graph = {}
+        # Incremented on every change of the edges, so cached traversal results can be checked for staleness
+        self.version = 0
+        # Connected components, only kept up to date after track_components is called
+        self.components = None
+        self.components_stale = False
+        self.lazy_rebuild = True
         self._create_graph()
 
     def _create_graph(self):
@@ -43,6 +51,10 @@ class Graph:
         """Get all neighbor node labels of node"""
         return self.graph[node].keys()
 
+    def get_weighted_neighbors(self, node):
+        """Get (neighbor, weight) pairs for all edges of node"""
+        return self.graph[node].items()
+
     def add_edge(self, node, target_node, weight=0):
         """
         Adds the edge (node, target_node) with a weight.
@@ -54,6 +66,9 @@ class Graph:
         """
         if target_node not in self.graph[node].keys():
             self.graph[node][target_node] = weight
+            self.version += 1
+            if self.components is not None and not self.components_stale:
+                self.components.union(node, target_node)
         if not self.directed:
             if node not in self.graph[target_node].keys():
                 self.graph[target_node][node] = weight
@@ -66,11 +81,17 @@ class Graph:
         :param node: str, source node of edge
         :param target_node: str, target node of edge
         """
-        if target_node not in self.graph[node].keys():
+        if target_node in self.graph[node].keys():
             del self.graph[node][target_node]
+            self.version += 1
+            if self.components is not None:
+                # A disjoint set can't split components, so they are rebuilt from the remaining edges
+                self.components_stale = True
         if not self.directed:
-            if node not in self.graph[target_node].keys():
+            if node in self.graph[target_node].keys():
                 del self.graph[target_node][node]
+        if self.components_stale and not self.lazy_rebuild:
+            self._rebuild_components()
 
     def edge_exists(self, node, target_node):
         """Check if the edge (node, target_node) exists in self.graph"""
@@ -82,3 +103,69 @@ class Graph:
             return self.graph[node][target_node]
         else:
             return None
+
+    def track_components(self, lazy_rebuild=True):
+        """
+        Keeps the connected components of the graph in a DisjointSet, that add_edge updates. For directed graphs these
+        are the weakly connected components (edge directions are ignored).
+
+        :param lazy_rebuild: bool, if True the components are rebuilt at the first query after remove_edge, otherwise
+            remove_edge rebuilds them immediately
+        """
+        self.lazy_rebuild = lazy_rebuild
+        self._rebuild_components()
+
+    def _rebuild_components(self):
+        self.components = DisjointSet(self.node_labels)
+        for node, neighbors in self.graph.items():
+            for neighbor in neighbors:
+                self.components.union(node, neighbor)
+        self.components_stale = False
+
+    def _get_components(self) -> DisjointSet:
+        if self.components is None:
+            self.track_components()
+        elif self.components_stale:
+            self._rebuild_components()
+        return self.components
+
+    def connected(self, node, other_node) -> bool:
+        """Whether there is a path between node and other_node (ignoring edge directions)"""
+        return self._get_components().connected(node, other_node)
+
+    def component_of(self, node):
+        """Representative node of the connected component of node"""
+        return self._get_components().find(node)
+
+    def component_size(self, node) -> int:
+        """Number of nodes in the connected component of node"""
+        return self._get_components().component_size(node)
+
+    def component_sizes(self) -> dict:
+        """Dict with the size of every connected component, keyed by its representative node"""
+        return self._get_components().component_sizes()
+
+
+if __name__ == '__main__':
+    graph = Graph(['A', 'B', 'C', 'D', 'E'], directed=False)
+    graph.track_components()
+    graph.add_edge('A', 'B')
+    graph.add_edge('B', 'C')
+    graph.add_edge('D', 'E')
+    assert graph.connected('A', 'C') and not graph.connected('A', 'D')
+    assert graph.component_of('C') == graph.component_of('A')
+    assert sorted(graph.component_sizes().values()) == [2, 3]
+
+    graph.remove_edge('B', 'C')
+    assert graph.components_stale
+    assert not graph.connected('A', 'C') and graph.component_size('A') == 2
+    graph.add_edge('C', 'D')
+    assert graph.component_size('E') == 3
+
+    directed_graph = Graph(4, directed=True)
+    directed_graph.track_components(lazy_rebuild=False)
+    directed_graph.add_edge(0, 1)
+    directed_graph.add_edge(2, 1)
+    assert directed_graph.connected(0, 2)
+    directed_graph.remove_edge(2, 1)
+    assert not directed_graph.components_stale and not directed_graph.connected(0, 2)
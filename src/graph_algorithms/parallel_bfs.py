@@ -0,0 +1,298 @@
+"""
+Hop distances from many start nodes at once, computed by a process pool.
+The graph is converted to CSR form (offsets and targets arrays) and placed in one shared memory block, which the
+workers map instead of receiving a pickled copy. Every worker runs breadth first searches for a batch of start nodes
+and writes the distance rows into a shared (n_sources x n_nodes) matrix of 32 bit integers, or returns them one by one
+when they are streamed. The returned DistanceMatrix is a view of the shared matrix, so the matrix is never copied.
+
+With bit_parallel, a worker searches from 64 start nodes at the same time: every node has a 64 bit mask with the start
+nodes that reached it, and one pass over the frontier edges per level ORs the masks of the frontier nodes into their
+neighbors. Every edge is then read once per level for 64 start nodes, instead of once per start node.
+"""
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from src.graph_algorithms.csr_graph import CSRGraph, id_typecode
+
+NOT_REACHED = -1
+BIT_PARALLEL_WIDTH = 64
+# Sources per task when streaming, small so few rows are held by the batches in flight
+STREAM_BATCH_SIZE = 8
+
+
+class DistanceMatrix:
+    def __init__(self, data, sources, labels, shared_memory=None):
+        """
+        Hop distances from every source (row) to every node (column), NOT_REACHED when there is no path.
+
+        :param data: array('i') or memoryview with format 'i', the rows one after the other
+        :param sources: list, source node labels in row order
+        :param labels: list, node labels in column order
+        :param shared_memory: SharedMemory, the block data is a view of, it is closed by close
+        """
+        self.data = data
+        self.shared_memory = shared_memory
+        self.sources = sources
+        self.labels = labels
+        self.n_columns = len(labels)
+        self.rows = {source: row for row, source in enumerate(sources)}
+        self.columns = {label: column for column, label in enumerate(labels)}
+
+    def row(self, source):
+        """Distances from source to all nodes, in the order of self.labels"""
+        start = self.rows[source] * self.n_columns
+        row = array('i')
+        row.frombytes(memoryview(self.data[start:start + self.n_columns]).cast('B'))
+        return row
+
+    def get_distance(self, source, target_node):
+        return self.data[self.rows[source] * self.n_columns + self.columns[target_node]]
+
+    def close(self):
+        """Releases the shared memory block the matrix is a view of, the matrix can't be used afterwards"""
+        if self.shared_memory is not None:
+            self.data.release()
+            self.shared_memory.close()
+            self.shared_memory = None
+
+    def __del__(self):
+        self.close()
+
+
+def _share_graph(graph: CSRGraph):
+    """Copies the offsets and targets of graph into a new shared memory block"""
+    offsets_size = len(graph.offsets) * graph.offsets.itemsize
+    shared_memory = SharedMemory(create=True, size=max(offsets_size + len(graph.targets) * graph.targets.itemsize, 1))
+    shared_memory.buf[:offsets_size] = graph.offsets.tobytes()
+    shared_memory.buf[offsets_size:offsets_size + len(graph.targets) * graph.targets.itemsize] = \
+        graph.targets.tobytes()
+    return shared_memory
+
+
+def _graph_views(shared_memory, n_nodes, n_edges):
+    """Offsets and targets memoryviews of a graph shared by _share_graph"""
+    offsets_size = (n_nodes + 1) * 8
+    offsets = shared_memory.buf[:offsets_size].cast('q')
+    target_typecode = id_typecode(n_nodes)
+    targets = shared_memory.buf[offsets_size:offsets_size + n_edges * array(target_typecode).itemsize] \
+        .cast(target_typecode)
+    return offsets, targets
+
+
+def _breadth_first_distances(offsets, targets, n_nodes, source):
+    """Hop distances from the node id source to all node ids"""
+    distances = array('i', [NOT_REACHED]) * n_nodes
+    distances[source] = 0
+    frontier = [source]
+    distance = 0
+    while len(frontier) > 0:
+        distance += 1
+        next_frontier = []
+        for node in frontier:
+            for position in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[position]
+                if distances[neighbor] == NOT_REACHED:
+                    distances[neighbor] = distance
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances
+
+
+def _bit_parallel_distances(offsets, targets, n_nodes, sources):
+    """Hop distances from up to 64 node ids in sources to all node ids, one row per source"""
+    rows = [array('i', [NOT_REACHED]) * n_nodes for _ in sources]
+    visited = [0] * n_nodes
+    frontier_masks = {}
+    for bit, source in enumerate(sources):
+        rows[bit][source] = 0
+        visited[source] |= 1 << bit
+        frontier_masks[source] = frontier_masks.get(source, 0) | 1 << bit
+
+    distance = 0
+    while len(frontier_masks) > 0:
+        distance += 1
+        reached = {}
+        for node, mask in frontier_masks.items():
+            for position in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[position]
+                new_bits = mask & ~visited[neighbor]
+                if new_bits:
+                    reached[neighbor] = reached.get(neighbor, 0) | new_bits
+        for node, mask in reached.items():
+            visited[node] |= mask
+            while mask:
+                lowest_bit = mask & -mask
+                rows[lowest_bit.bit_length() - 1][node] = distance
+                mask ^= lowest_bit
+        frontier_masks = reached
+    return rows
+
+
+def _search_batch(graph_name, n_nodes, n_edges, sources, bit_parallel, output_name, first_row):
+    """
+    Worker function: computes the distance rows of a batch of source ids. The rows are written to the shared output
+    matrix starting at first_row, or returned as bytes when there is no output matrix.
+    """
+    graph_memory = SharedMemory(name=graph_name)
+    output_memory = SharedMemory(name=output_name) if output_name else None
+    try:
+        offsets, targets = _graph_views(graph_memory, n_nodes, n_edges)
+        rows = []
+        if bit_parallel:
+            for start in range(0, len(sources), BIT_PARALLEL_WIDTH):
+                rows.extend(_bit_parallel_distances(offsets, targets, n_nodes,
+                                                    sources[start:start + BIT_PARALLEL_WIDTH]))
+        else:
+            for source in sources:
+                rows.append(_breadth_first_distances(offsets, targets, n_nodes, source))
+        offsets.release()
+        targets.release()
+
+        if output_memory is None:
+            return [row.tobytes() for row in rows]
+        output = output_memory.buf.cast('i')
+        for row_index, row in enumerate(rows, first_row):
+            output[row_index * n_nodes:(row_index + 1) * n_nodes] = row
+        output.release()
+        return None
+    finally:
+        graph_memory.close()
+        if output_memory is not None:
+            output_memory.close()
+
+
+def _batches(n_sources, workers, bit_parallel, batch_size=None):
+    """(start, end) ranges of sources per task, by default a few tasks per worker to even out the load"""
+    batch_size = batch_size if batch_size else max(-(-n_sources // (4 * workers)), 1)
+    if bit_parallel:
+        batch_size = -(-batch_size // BIT_PARALLEL_WIDTH) * BIT_PARALLEL_WIDTH
+    return [(start, min(start + batch_size, n_sources)) for start in range(0, n_sources, batch_size)]
+
+
+def _to_csr(graph):
+    return graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+
+
+def multi_source_distances(graph, sources=None, workers=None, bit_parallel=False) -> DistanceMatrix:
+    """
+    Hop distances from every node in sources to every node of graph.
+
+    :param graph: Graph or CSRGraph
+    :param sources: Iterable with source node labels, defaults to all nodes (all-pairs distances)
+    :param workers: int, number of processes, defaults to os.cpu_count()
+    :param bit_parallel: bool, whether every worker searches from 64 sources at the same time
+    :return: DistanceMatrix, backed by the shared memory block the workers wrote to, which is freed when the matrix is
+        closed or garbage collected
+    """
+    csr_graph = _to_csr(graph)
+    sources = list(sources) if sources is not None else list(csr_graph.labels)
+    source_ids = [csr_graph.node_id(source) for source in sources]
+    n_nodes = csr_graph.n_nodes()
+    workers = workers if workers else os.cpu_count()
+
+    graph_memory = _share_graph(csr_graph)
+    output_memory = SharedMemory(create=True, size=max(len(sources) * n_nodes * 4, 4))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_search_batch, graph_memory.name, n_nodes, csr_graph.n_edges(),
+                                       source_ids[start:end], bit_parallel, output_memory.name, start)
+                       for start, end in _batches(len(sources), workers, bit_parallel)]
+            for future in futures:
+                future.result()
+    except BaseException:
+        output_memory.close()
+        raise
+    finally:
+        graph_memory.close()
+        graph_memory.unlink()
+        # Only the name is removed, the mapping of this process stays valid until the matrix is closed
+        output_memory.unlink()
+    data = output_memory.buf.cast('i')[:len(sources) * n_nodes]
+    return DistanceMatrix(data, sources, csr_graph.labels, output_memory)
+
+
+def _batch_rows(sources, start, future):
+    """Yields the (source, distances) tuples of a finished streaming batch"""
+    for source, row_bytes in zip(sources[start:], future.result()):
+        row = array('i')
+        row.frombytes(row_bytes)
+        yield source, row
+
+
+def stream_distances(graph, sources=None, workers=None, bit_parallel=False):
+    """
+    Yields (source, distances) tuples in the order of sources, where distances is an array('i') with the hop distance
+    to every node in the order of CSRGraph.from_graph(graph).labels.
+    Sources are handed out in batches of STREAM_BATCH_SIZE (or BIT_PARALLEL_WIDTH) sources and at most 2 * workers
+    batches are in flight, so only their rows are held in memory, not the whole matrix. New batches are only
+    submitted while the caller consumes rows.
+
+    See multi_source_distances for the parameters.
+    """
+    csr_graph = _to_csr(graph)
+    sources = list(sources) if sources is not None else list(csr_graph.labels)
+    source_ids = [csr_graph.node_id(source) for source in sources]
+    workers = workers if workers else os.cpu_count()
+    batches = _batches(len(sources), workers, bit_parallel, STREAM_BATCH_SIZE)
+
+    graph_memory = _share_graph(csr_graph)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            try:
+                for start, end in batches:
+                    pending.append((start, executor.submit(
+                        _search_batch, graph_memory.name, csr_graph.n_nodes(), csr_graph.n_edges(),
+                        source_ids[start:end], bit_parallel, None, start)))
+                    while len(pending) >= 2 * workers:
+                        yield from _batch_rows(sources, *pending.popleft())
+                while len(pending) > 0:
+                    yield from _batch_rows(sources, *pending.popleft())
+            finally:
+                # Batches that were not started yet are not needed when the caller stops early
+                for _, future in pending:
+                    future.cancel()
+    finally:
+        graph_memory.close()
+        graph_memory.unlink()
+
+
+if __name__ == '__main__':
+    import random
+
+    from src.graph_algorithms.breadth_first_search import BreadthFirstSearch
+    from src.graph_algorithms.graph import Graph
+
+    random.seed(5)
+    graph = Graph(300, directed=True)
+    for _ in range(900):
+        graph.add_edge(random.randrange(300), random.randrange(300))
+
+    expected = {}
+    breadth_first_search = BreadthFirstSearch(graph)
+    for source in range(0, 300, 3):
+        breadth_first_search.traverse_graph(source)
+        expected[source] = [distance if distance != float("inf") else NOT_REACHED
+                            for distance in breadth_first_search.distances.values()]
+
+    for bit_parallel in (False, True):
+        matrix = multi_source_distances(graph, range(0, 300, 3), workers=3, bit_parallel=bit_parallel)
+        assert all(matrix.row(source).tolist() == expected[source] for source in expected)
+        assert matrix.get_distance(0, 0) == 0
+
+    for bit_parallel in (False, True):
+        streamed = dict(stream_distances(graph, range(0, 300, 3), workers=2, bit_parallel=bit_parallel))
+        assert list(streamed) == list(range(0, 300, 3))
+        assert all(streamed[source].tolist() == expected[source] for source in expected)
+    stream = stream_distances(graph, range(300), workers=2)
+    assert next(stream)[0] == 0
+    stream.close()
+
+    all_pairs = multi_source_distances(graph, workers=2)
+    assert len(all_pairs.data) == 300 * 300 and all_pairs.row(0).tolist() == expected[0]
+    all_pairs.close()
+    no_sources = multi_source_distances(graph, [], workers=1)
+    assert len(no_sources.data) == 0
@@ -0,0 +1,145 @@
+"""
+Cache of shortest path trees (the predecessor and distances of a traversal from one start node), for graphs that are
+queried from the same start nodes over and over.
+Trees are kept in least recently used order and evicted when their estimated size exceeds the memory cap. Every tree
+is stored with the graph version it was computed for: Graph.add_edge and Graph.remove_edge increment the version, so
+trees of an older version are dropped instead of returned.
+"""
+import sys
+from collections import OrderedDict
+
+from src.graph_algorithms.breadth_first_search import BreadthFirstSearch
+from src.graph_algorithms.graph import Graph
+
+# Traversal state that path queries don't need, it is cleared before a tree is cached
+DISCARDED_STATE = ('traversed', 'settled', 'frontier')
+
+
+def _is_cached_object(value):
+    """Whether CPython shares value between all its uses (None, bools and the small ints -5..256)"""
+    return value is None or type(value) is bool or (type(value) is int and -5 <= value <= 256)
+
+
+def tree_size(search) -> int:
+    """
+    Estimated size in bytes of the traversal result of search: its predecessor and distances containers plus the
+    value objects they refer to. Every distinct value object is counted once, values CPython shares anyway are skipped.
+    The keys are the node labels of the graph and are not counted, predecessor values are node labels as well, so the
+    estimate is on the high side for graphs with large labels. Arrays (like those of CSRBreadthFirstSearch) store their
+    values inline, sys.getsizeof already includes them.
+    """
+    size = 0
+    counted = set()
+    for container in (search.predecessor, search.distances):
+        size += sys.getsizeof(container)
+        if isinstance(container, dict):
+            for value in container.values():
+                if id(value) not in counted and not _is_cached_object(value):
+                    counted.add(id(value))
+                    size += sys.getsizeof(value)
+    return size
+
+
+class ShortestPathTreeCache:
+    def __init__(self, graph: Graph, search_class=BreadthFirstSearch, max_bytes=256 * 1024 * 1024):
+        """
+
+        :param graph: Graph, or an immutable graph like CSRGraph (without version, trees then never go stale)
+        :param search_class: class with the traverse_graph(start_node)/find_path_to_node(target_node) interface and
+            predecessor/distances attributes, like BreadthFirstSearch, CSRBreadthFirstSearch or Dijkstra
+        :param max_bytes: int, memory cap for all cached trees, at least one tree is always kept
+        """
+        self.graph = graph
+        self.search_class = search_class
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.sizes = {}
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _version(self):
+        return getattr(self.graph, 'version', 0)
+
+    def _evict(self, start_node):
+        self.trees.pop(start_node)
+        self.n_bytes -= self.sizes.pop(start_node)
+
+    def clear(self):
+        self.trees.clear()
+        self.sizes.clear()
+        self.n_bytes = 0
+
+    def get_tree(self, start_node):
+        """
+        Returns the traversed search object for start_node, from the cache when it's there for the current graph
+        version, otherwise traverses the graph and caches the result.
+        """
+        version = self._version()
+        if start_node in self.trees:
+            tree_version, search = self.trees[start_node]
+            if tree_version == version:
+                self.trees.move_to_end(start_node)
+                self.hits += 1
+                return search
+            self._evict(start_node)
+
+        self.misses += 1
+        search = self.search_class(self.graph)
+        search.traverse_graph(start_node)
+        for name in DISCARDED_STATE:
+            if hasattr(search, name):
+                setattr(search, name, type(getattr(search, name))())
+        self.trees[start_node] = (version, search)
+        self.sizes[start_node] = tree_size(search)
+        self.n_bytes += self.sizes[start_node]
+        while self.n_bytes > self.max_bytes and len(self.trees) > 1:
+            self._evict(next(iter(self.trees)))
+        return search
+
+    def find_path_to_node(self, start_node, target_node):
+        """Path from start_node to target_node in the format of the search class find_path_to_node"""
+        return self.get_tree(start_node).find_path_to_node(target_node)
+
+    def get_distance(self, start_node, target_node):
+        return self.get_tree(start_node).get_distance(target_node)
+
+
+if __name__ == '__main__':
+    from src.graph_algorithms.csr_graph import CSRBreadthFirstSearch, CSRGraph
+    from src.graph_algorithms.shortest_path import Dijkstra
+
+    graph = Graph(['A', 'B', 'C', 'D', 'E'], directed=False)
+    graph.add_edge('A', 'B')
+    graph.add_edge('B', 'C')
+    graph.add_edge('C', 'D')
+    graph.add_edge('D', 'E')
+    cache = ShortestPathTreeCache(graph)
+    assert cache.find_path_to_node('A', 'E') == ['A', 'B', 'C', 'D', 'E']
+    assert cache.find_path_to_node('A', 'D') == ['A', 'B', 'C', 'D']
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    graph.add_edge('B', 'E')
+    assert cache.find_path_to_node('A', 'E') == ['A', 'B', 'E']
+    graph.remove_edge('B', 'E')
+    assert not graph.edge_exists('E', 'B')
+    assert cache.find_path_to_node('A', 'E') == ['A', 'B', 'C', 'D', 'E']
+    assert cache.misses == 3
+
+    big_graph = Graph(1000)
+    for node in range(999):
+        big_graph.add_edge(node, node + 1, 2)
+    search = Dijkstra(big_graph)
+    search.traverse_graph(0)
+    # Distances up to 1998 are int objects of their own, 28 bytes each next to the dict entries
+    assert tree_size(search) >= sys.getsizeof(search.predecessor) + sys.getsizeof(search.distances) + 28 * 800
+    cache = ShortestPathTreeCache(big_graph, Dijkstra, max_bytes=10 * tree_size(search))
+    for start_node in range(50):
+        assert cache.get_distance(start_node, 999) == 2 * (999 - start_node)
+    assert len(cache.trees) == 10 and cache.n_bytes <= cache.max_bytes
+    assert list(cache.trees)[-1] == 49
+
+    csr_cache = ShortestPathTreeCache(CSRGraph.from_graph(big_graph), CSRBreadthFirstSearch)
+    assert csr_cache.get_distance(10, 20) == 10
+    assert csr_cache.find_path_to_node(10, 12) == [10, 11, 12]
+    assert csr_cache.get_tree(10) is csr_cache.get_tree(10)
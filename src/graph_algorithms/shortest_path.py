@@ -0,0 +1,245 @@
+"""
+Weighted shortest paths over the edge weights of a graph (all weights should be >= 0).
+
+Dijkstra settles the nodes in order of their distance from the start node, using an indexed binary heap
+(PriorityQueue) so every node is in the queue at most once and its distance is lowered with decrease_key.
+A* orders the queue by distance + heuristic(node, target_node) instead, which settles fewer nodes when the heuristic
+is a good lower bound of the remaining distance. The heuristic should never overestimate the remaining distance
+(admissible). It doesn't have to be consistent: when a shorter path to an already settled node is found, the node is
+reopened (put back in the queue), so the path found is still the shortest.
+Bidirectional Dijkstra searches from the start node and (over the reversed edges) from the target node at the same
+time, and stops when the two searches can no longer find a shorter connection than the best one found so far.
+"""
+from src.graph_algorithms.graph import Graph
+from src.sorting_algorithms.priority_queue import PriorityQueue
+
+
+def _check_weight(node, neighbor, weight):
+    if weight < 0:
+        raise ValueError(f"Edge ({node}, {neighbor}) has negative weight {weight}, Dijkstra needs weights >= 0")
+
+
+def _reversed_neighbors(graph):
+    """Function node -> (neighbor, weight) pairs of the reversed edges, for the backward search"""
+    if not graph.directed:
+        return graph.get_weighted_neighbors
+    if hasattr(graph, 'transpose'):
+        return graph.transpose().get_weighted_neighbors
+    reversed_edges = {node: {} for node in graph.get_nodes()}
+    for node in graph.get_nodes():
+        for neighbor, weight in graph.get_weighted_neighbors(node):
+            reversed_edges[neighbor][node] = weight
+    return lambda node: reversed_edges[node].items()
+
+
+def path_weight(graph, path) -> float:
+    """Sum of the edge weights along path"""
+    return sum(graph.get_edge_weight(node, next_node) for node, next_node in zip(path, path[1:]))
+
+
+class Dijkstra:
+    def __init__(self, graph: Graph, heuristic=None):
+        """
+
+        :param graph: Graph (or a graph with the same get_weighted_neighbors method, like CSRGraph)
+        :param heuristic: Function, heuristic(node, target_node) -> lower bound of the distance from node to
+            target_node (admissible, not necessarily consistent). When given, traverse_graph runs A* (and needs a
+            target_node)
+        """
+        self.graph = graph
+        self.heuristic = heuristic
+        self.start_node = None
+        self.predecessor = {}
+        self.distances = {}
+        self.settled = set()
+        self.graph_traversed = False
+
+    def traverse_graph(self, start_node, target_node=None):
+        """
+        Computes the distances from start_node, stops as soon as target_node is settled (if given).
+        Nodes that are not reached have no entry in self.distances.
+
+        :param start_node: node label
+        :param target_node: node label, to stop early, required when a heuristic is used
+        """
+        if self.heuristic is not None and target_node is None:
+            raise ValueError("A* needs a target_node for the heuristic")
+        self.start_node = start_node
+        self.predecessor = {start_node: -1}
+        self.distances = {start_node: 0}
+        self.settled = set()
+
+        queue = PriorityQueue([(start_node, self._priority(start_node, target_node))])
+        while len(queue) > 0:
+            node, _ = queue.pop()
+            self.settled.add(node)
+            if node == target_node:
+                break
+            distance = self.distances[node]
+            for neighbor, weight in self.graph.get_weighted_neighbors(node):
+                _check_weight(node, neighbor, weight)
+                new_distance = distance + weight
+                if neighbor in self.distances and new_distance >= self.distances[neighbor]:
+                    continue
+                self.distances[neighbor] = new_distance
+                self.predecessor[neighbor] = node
+                if neighbor in queue:
+                    queue.decrease_key(neighbor, self._priority(neighbor, target_node))
+                else:
+                    # New node, or (only with an inconsistent A* heuristic) a settled node that is reopened
+                    self.settled.discard(neighbor)
+                    queue.push(neighbor, self._priority(neighbor, target_node))
+        self.graph_traversed = True
+
+    def _priority(self, node, target_node):
+        if self.heuristic is None:
+            return self.distances[node]
+        return self.distances[node] + self.heuristic(node, target_node)
+
+    def get_distance(self, target_node):
+        """Weighted distance from the start node to target_node, inf when it wasn't reached"""
+        return self.distances.get(target_node, float("inf"))
+
+    def find_path_to_node(self, target_node):
+        """
+        Given a target node, find the shortest path from the start node to that target node by following the
+        predecessors. With early termination, only the target node and nodes settled before it have a correct path.
+
+        :param target_node: str, The end node
+        :return: list, [start_node, node_1, node_2, ..., node_n, target_node], None if target_node wasn't reached
+        """
+        if not self.graph_traversed:
+            print("Graph not traversed yet. Call the traverse_graph function first.")
+            return None
+        if target_node not in self.distances:
+            return None
+        path = [target_node]
+        while self.predecessor[path[-1]] != -1:
+            path.append(self.predecessor[path[-1]])
+        path.reverse()
+        return path
+
+
+def dijkstra(graph, start_node, target_node):
+    """Shortest path from start_node to target_node, as a list of nodes, None if there is no path"""
+    search = Dijkstra(graph)
+    search.traverse_graph(start_node, target_node)
+    return search.find_path_to_node(target_node)
+
+
+def a_star(graph, start_node, target_node, heuristic):
+    """
+    Shortest path from start_node to target_node with A*, None if there is no path.
+
+    :param heuristic: Function, heuristic(node, target_node) -> lower bound of the distance from node to target_node,
+        does not need to be consistent
+    """
+    search = Dijkstra(graph, heuristic)
+    search.traverse_graph(start_node, target_node)
+    return search.find_path_to_node(target_node)
+
+
+def bidirectional_dijkstra(graph, start_node, target_node):
+    """
+    Shortest path from start_node to target_node, searching from both ends. Every step settles a node of the search
+    with the smallest queue head. Each relaxed edge that connects to a node the other search has reached is a
+    candidate connection; the search stops when the sum of both queue heads is at least the best connection.
+
+    :return: list, [start_node, node_1, ..., target_node], None if there is no path
+    """
+    if start_node == target_node:
+        return [start_node]
+    get_neighbors = (graph.get_weighted_neighbors, _reversed_neighbors(graph))
+    distances = ({start_node: 0}, {target_node: 0})
+    predecessor = ({start_node: -1}, {target_node: -1})
+    settled = (set(), set())
+    queues = (PriorityQueue([(start_node, 0)]), PriorityQueue([(target_node, 0)]))
+    best_distance = float("inf")
+    meeting_node = None
+
+    while len(queues[0]) > 0 and len(queues[1]) > 0:
+        if queues[0].peek()[1] + queues[1].peek()[1] >= best_distance:
+            break
+        side = 0 if queues[0].peek()[1] <= queues[1].peek()[1] else 1
+        other_side = 1 - side
+        node, distance = queues[side].pop()
+        settled[side].add(node)
+        for neighbor, weight in get_neighbors[side](node):
+            _check_weight(node, neighbor, weight)
+            if neighbor in settled[side]:
+                continue
+            new_distance = distance + weight
+            if neighbor not in distances[side]:
+                distances[side][neighbor] = new_distance
+                predecessor[side][neighbor] = node
+                queues[side].push(neighbor, new_distance)
+            elif new_distance < distances[side][neighbor]:
+                distances[side][neighbor] = new_distance
+                predecessor[side][neighbor] = node
+                queues[side].decrease_key(neighbor, new_distance)
+            if neighbor in distances[other_side]:
+                connection = distances[side][neighbor] + distances[other_side][neighbor]
+                if connection < best_distance:
+                    best_distance = connection
+                    meeting_node = neighbor
+
+    if meeting_node is None:
+        return None
+    path = [meeting_node]
+    while predecessor[0][path[-1]] != -1:
+        path.append(predecessor[0][path[-1]])
+    path.reverse()
+    while predecessor[1][path[-1]] != -1:
+        path.append(predecessor[1][path[-1]])
+    return path
+
+
+if __name__ == '__main__':
+    import random
+
+    graph = Graph(['A', 'B', 'C', 'D', 'E'], directed=False)
+    graph.add_edge('A', 'B', 1)
+    graph.add_edge('B', 'C', 1)
+    graph.add_edge('C', 'D', 1)
+    graph.add_edge('D', 'E', 1)
+    graph.add_edge('B', 'E', 5)
+    search = Dijkstra(graph)
+    search.traverse_graph('A')
+    assert search.find_path_to_node('E') == ['A', 'B', 'C', 'D', 'E']
+    assert search.get_distance('E') == 4
+    assert dijkstra(graph, 'A', 'D') == ['A', 'B', 'C', 'D']
+    assert bidirectional_dijkstra(graph, 'A', 'E') == ['A', 'B', 'C', 'D', 'E']
+
+    # Grid with random weights >= 1, so the manhattan distance is a lower bound for A*
+    size = 30
+    grid = Graph(size * size, directed=True)
+    random.seed(3)
+    for node in range(size * size):
+        row, column = divmod(node, size)
+        for neighbor_row, neighbor_column in [(row + 1, column), (row, column + 1), (row - 1, column),
+                                              (row, column - 1)]:
+            if 0 <= neighbor_row < size and 0 <= neighbor_column < size:
+                grid.add_edge(node, neighbor_row * size + neighbor_column, random.randint(1, 9))
+
+    def manhattan(node, target_node):
+        return abs(node // size - target_node // size) + abs(node % size - target_node % size)
+
+    search = Dijkstra(grid)
+    search.traverse_graph(0)
+    for target in random.sample(range(size * size), 20):
+        expected = search.get_distance(target)
+        assert path_weight(grid, dijkstra(grid, 0, target)) == expected
+        assert path_weight(grid, a_star(grid, 0, target, manhattan)) == expected
+        assert path_weight(grid, bidirectional_dijkstra(grid, 0, target)) == expected
+
+    # Admissible but inconsistent heuristic: C is first settled through B, then reopened when A is expanded
+    graph = Graph(['S', 'A', 'B', 'C', 'G'], directed=True)
+    for node, target_node, weight in [('S', 'A', 1), ('S', 'B', 1), ('A', 'C', 1), ('B', 'C', 3), ('C', 'G', 3)]:
+        graph.add_edge(node, target_node, weight)
+    assert a_star(graph, 'S', 'G', lambda node, target_node: 4 if node == 'A' else 0) == ['S', 'A', 'C', 'G']
+
+    disconnected = Graph(3, directed=True)
+    disconnected.add_edge(0, 1, 2)
+    assert dijkstra(disconnected, 0, 2) is None
+    assert bidirectional_dijkstra(disconnected, 0, 2) is None
+    assert bidirectional_dijkstra(disconnected, 1, 0) is None
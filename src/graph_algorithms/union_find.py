@@ -0,0 +1,95 @@
+"""
+Disjoint set (union-find) for the connected components of a graph.
+Every element has a parent, the root of a tree is the representative of its set. find follows the parents to the root
+and halves the path on the way (every visited element is linked to its grandparent), union links the root of the
+lower rank tree to the other root. Together this makes both operations near constant time (inverse Ackermann).
+Elements are interned to dense integer ids, parents and sizes are kept in arrays and ranks in a bytearray.
+"""
+from array import array
+
+
+class DisjointSet:
+    def __init__(self, elements=()):
+        """
+
+        :param elements: Iterable with hashable elements, every element starts in its own set
+        """
+        self.ids = {}
+        self.elements = []
+        self.parent = array('q')
+        self.rank = bytearray()
+        self.sizes = array('q')
+        self.n_components = 0
+        for element in elements:
+            self.add(element)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __contains__(self, element):
+        return element in self.ids
+
+    def add(self, element):
+        """Adds element in a set of its own, does nothing when element is already in the disjoint set"""
+        if element in self.ids:
+            return
+        self.ids[element] = len(self.elements)
+        self.parent.append(len(self.elements))
+        self.elements.append(element)
+        self.rank.append(0)
+        self.sizes.append(1)
+        self.n_components += 1
+
+    def _find_root(self, element_id):
+        parent = self.parent
+        while parent[element_id] != element_id:
+            parent[element_id] = parent[parent[element_id]]
+            element_id = parent[element_id]
+        return element_id
+
+    def find(self, element):
+        """Returns the representative element of the set of element"""
+        return self.elements[self._find_root(self.ids[element])]
+
+    def union(self, element, other_element):
+        """
+        Merges the sets of element and other_element.
+
+        :return: bool, whether the sets were different (False when they were already connected)
+        """
+        root = self._find_root(self.ids[element])
+        other_root = self._find_root(self.ids[other_element])
+        if root == other_root:
+            return False
+        if self.rank[root] < self.rank[other_root]:
+            root, other_root = other_root, root
+        self.parent[other_root] = root
+        self.sizes[root] += self.sizes[other_root]
+        if self.rank[root] == self.rank[other_root]:
+            self.rank[root] += 1
+        self.n_components -= 1
+        return True
+
+    def connected(self, element, other_element) -> bool:
+        return self._find_root(self.ids[element]) == self._find_root(self.ids[other_element])
+
+    def component_size(self, element) -> int:
+        return self.sizes[self._find_root(self.ids[element])]
+
+    def component_sizes(self) -> dict:
+        """Returns a dict with the size of every set, keyed by its representative element"""
+        return {self.elements[element_id]: self.sizes[element_id]
+                for element_id in range(len(self.elements)) if self.parent[element_id] == element_id}
+
+
+if __name__ == '__main__':
+    disjoint_set = DisjointSet(range(10))
+    assert disjoint_set.union(1, 2) and disjoint_set.union(3, 4) and disjoint_set.union(2, 4)
+    assert not disjoint_set.union(1, 3)
+    assert disjoint_set.connected(1, 4) and not disjoint_set.connected(1, 5)
+    assert disjoint_set.find(4) == disjoint_set.find(1)
+    assert disjoint_set.component_size(3) == 4 and disjoint_set.n_components == 7
+    assert sorted(disjoint_set.component_sizes().values()) == [1, 1, 1, 1, 1, 1, 4]
+
+    disjoint_set.add('x')
+    assert len(disjoint_set) == 11 and disjoint_set.component_size('x') == 1
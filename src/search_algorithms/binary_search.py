@@ -1,3 +1,12 @@
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
 def binary_search(sorted_collection, target):
     """
     requires a sorted collection where C[i] < C[j] is true if i < j and where the target is comparable to the elements
@@ -31,6 +40,252 @@ def binary_search(sorted_collection, target):
     return False
 
 
+def bisect_left(sorted_collection, target, lower_bound=0, upper_bound=None):
+    """
+    Returns the insertion point of target in sorted_collection: the index of the first element that is not lower than
+    target (len(sorted_collection) if all elements are lower). Inserting target there keeps the collection sorted.
+
+    :param sorted_collection: Iterable, Collection of sorted elements
+    :param target: Same type as the elements in the collection
+    :param lower_bound: int, lowest index to search from, defaults to 0
+    :param upper_bound: int, index to search up to (exclusive), defaults to len(sorted_collection)
+    :return: int, insertion point of target
+    """
+    upper_bound = len(sorted_collection) if upper_bound is None else upper_bound
+    while lower_bound < upper_bound:
+        middle_index = (upper_bound + lower_bound) // 2
+        if sorted_collection[middle_index] < target:
+            lower_bound = middle_index + 1
+        else:
+            upper_bound = middle_index
+    return lower_bound
+
+
+def bisect_right(sorted_collection, target, lower_bound=0, upper_bound=None):
+    """
+    Returns the index of the first element in sorted_collection that is greater than target (the insertion point
+    after any elements equal to target). See bisect_left for the parameters.
+    """
+    upper_bound = len(sorted_collection) if upper_bound is None else upper_bound
+    while lower_bound < upper_bound:
+        middle_index = (upper_bound + lower_bound) // 2
+        if target < sorted_collection[middle_index]:
+            upper_bound = middle_index
+        else:
+            lower_bound = middle_index + 1
+    return lower_bound
+
+
+def equal_range(sorted_collection, target):
+    """
+    Returns the range of indices holding elements equal to target, as a tuple (first, end) where end is exclusive.
+    When target is not in the collection, first == end == the insertion point of target.
+    """
+    first = bisect_left(sorted_collection, target)
+    return first, bisect_right(sorted_collection, target, first)
+
+
+def gallop_left(sorted_collection, target, start):
+    """
+    Insertion point of target in sorted_collection, given that it is not lower than start.
+    Probes start + 1, start + 3, start + 7, ... until an element that is not lower than target is found, then
+    binary searches the last step. Takes O(log d) comparisons when the insertion point is d positions after start.
+    """
+    n = len(sorted_collection)
+    step = 1
+    lower_bound = start
+    upper_bound = start
+    while upper_bound < n and sorted_collection[upper_bound] < target:
+        lower_bound = upper_bound + 1
+        upper_bound = start + step
+        step *= 2
+    return bisect_left(sorted_collection, target, lower_bound, min(upper_bound, n))
+
+
+def search_many(sorted_collection, queries):
+    """
+    Returns the insertion point (see bisect_left) of every query in sorted_collection.
+
+    - NumPy arrays are searched vectorized with numpy.searchsorted
+    - Sorted queries are searched with a merge-style walk: every query is searched by galloping forward from the
+      insertion point of the previous query, which takes O(m log(n / m)) comparisons for m queries
+    - Otherwise every query is binary searched separately
+
+    :param sorted_collection: Iterable, Collection of sorted elements
+    :param queries: Iterable with targets
+    :return: list of int insertion points (NumPy array for NumPy input)
+    """
+    if np is not None and isinstance(sorted_collection, np.ndarray):
+        return np.searchsorted(sorted_collection, queries, side='left')
+
+    queries = list(queries)
+    if all(not queries[i] < queries[i - 1] for i in range(1, len(queries))):
+        positions = []
+        position = 0
+        for query in queries:
+            position = gallop_left(sorted_collection, query, position)
+            positions.append(position)
+        return positions
+    return [bisect_left(sorted_collection, query) for query in queries]
+
+
+def interpolation_search(sorted_collection, target):
+    """
+    Searches a sorted collection of numbers for target by estimating its position from the values at the bounds:
+    position = lower + (target - C[lower]) * (upper - lower) / (C[upper] - C[lower])
+    For uniformly distributed keys this takes about log log n probes.
+
+    Safeguards (interpolation-binary search):
+    - After every estimate a guard index sqrt(range) further in the direction of target is probed, so a good estimate
+      leaves at most sqrt(range) elements to search
+    - When a step does not halve the search range (the keys are not uniform there), the next step is a binary search
+      step, which keeps the worst case at O(log n) probes
+
+    :param sorted_collection: Iterable, Collection of sorted numbers
+    :param target: number
+    :return: int, index of (an element equal to) target, or -1 if target is not found
+    """
+    lower_bound = 0
+    upper_bound = len(sorted_collection) - 1
+    if upper_bound < 0:
+        return -1
+    lower_value = sorted_collection[lower_bound]
+    upper_value = sorted_collection[upper_bound]
+    bisect_next = False
+    while lower_bound <= upper_bound:
+        if target < lower_value or target > upper_value:
+            return -1
+
+        range_size = upper_bound - lower_bound
+        interpolate = not bisect_next and upper_value != lower_value
+        if interpolate:
+            probe_index = lower_bound + int((target - lower_value) * range_size / (upper_value - lower_value))
+        else:
+            probe_index = (lower_bound + upper_bound) // 2
+
+        probe_value = sorted_collection[probe_index]
+        if probe_value == target:
+            return probe_index
+
+        guard_step = math.isqrt(range_size) + 1 if interpolate else 0
+        if probe_value < target:
+            lower_bound = probe_index + 1
+            guard_index = probe_index + guard_step
+            if guard_step and guard_index < upper_bound:
+                guard_value = sorted_collection[guard_index]
+                if guard_value < target:
+                    lower_bound = guard_index + 1
+                else:
+                    upper_bound = guard_index
+                    upper_value = guard_value
+            if lower_bound <= upper_bound:
+                lower_value = sorted_collection[lower_bound]
+        else:
+            upper_bound = probe_index - 1
+            guard_index = probe_index - guard_step
+            if guard_step and guard_index > lower_bound:
+                guard_value = sorted_collection[guard_index]
+                if guard_value > target:
+                    upper_bound = guard_index - 1
+                else:
+                    lower_bound = guard_index
+                    lower_value = guard_value
+            if lower_bound <= upper_bound:
+                upper_value = sorted_collection[upper_bound]
+        bisect_next = upper_bound - lower_bound > range_size // 2
+    return -1
+
+
+def _value_or_none(sorted_collection, index):
+    """Returns sorted_collection[index], or None when the index is past the end of the collection"""
+    try:
+        return sorted_collection[index]
+    except IndexError:
+        return None
+
+
+def exponential_search(sorted_collection, target):
+    """
+    Searches a sorted collection of unknown length (e.g. a lazily loaded or growing source that raises an IndexError
+    past its end) for target. The indices 1, 2, 4, 8, ... are probed until an element that is not lower than target
+    (or the end) is found, then the last doubled range is binary searched. Takes O(log i) probes for a target at
+    index i, and never needs len(sorted_collection).
+
+    :param sorted_collection: Collection of sorted elements that supports indexing
+    :param target: Same type as the elements in the collection
+    :return: int, index of (an element equal to) target, or -1 if target is not found
+    """
+    upper_bound = 1
+    while True:
+        value = _value_or_none(sorted_collection, upper_bound - 1)
+        if value is None or not value < target:
+            break
+        upper_bound *= 2
+
+    lower_bound = upper_bound // 2
+    while lower_bound < upper_bound:
+        middle_index = (upper_bound + lower_bound) // 2
+        value = _value_or_none(sorted_collection, middle_index)
+        if value is not None and value < target:
+            lower_bound = middle_index + 1
+        else:
+            upper_bound = middle_index
+
+    value = _value_or_none(sorted_collection, lower_bound)
+    return lower_bound if value is not None and value == target else -1
+
+
+class EytzingerLayout:
+    def __init__(self, sorted_collection):
+        """
+        Stores a sorted collection in Eytzinger (breadth first) order: the root of the implicit binary search tree at
+        index 1 and the children of index k at 2k and 2k + 1. The first probes of every search hit the same few
+        (cached) elements at the start of the array and every next probe is close to the previous one, which gives
+        fewer cache misses than binary searching a large sorted array.
+        ranks holds the index in the sorted collection of every element, so searches can return sorted positions.
+
+        :param sorted_collection: Iterable, Collection of sorted elements
+        """
+        self.n = len(sorted_collection)
+        self.layout = [None] * (self.n + 1)
+        self.ranks = array('q', bytes(8 * (self.n + 1)))
+
+        # In order walk of the implicit tree, which visits the tree indices in sorted order
+        stack = []
+        k = 1
+        i = 0
+        while len(stack) > 0 or k <= self.n:
+            while k <= self.n:
+                stack.append(k)
+                k = 2 * k
+            k = stack.pop()
+            self.layout[k] = sorted_collection[i]
+            self.ranks[k] = i
+            i += 1
+            k = 2 * k + 1
+
+    def _lower_bound_index(self, target):
+        """
+        Index in self.layout of the first element that is not lower than target, 0 if all elements are lower.
+        Walks down the tree, going right while the element is lower than target. The last left turn is found by
+        removing the trailing right turns (one bits) and one more bit from k.
+        """
+        k = 1
+        while k <= self.n:
+            k = 2 * k + (self.layout[k] < target)
+        return k >> (k ^ (k + 1)).bit_length()
+
+    def bisect_left(self, target):
+        """Insertion point of target in the sorted collection (see bisect_left)"""
+        k = self._lower_bound_index(target)
+        return self.ranks[k] if k > 0 else self.n
+
+    def contains(self, target):
+        """Whether target exists in the collection"""
+        k = self._lower_bound_index(target)
+        return k > 0 and self.layout[k] == target
+
+
 if __name__ == '__main__':
     assert binary_search([1, 2, 3, 4, 7], 1)
     assert binary_search([1, 2, 3, 4, 7], 2)
@@ -39,3 +294,22 @@ if __name__ == '__main__':
     assert binary_search([1, 2, 3, 4, 7], 7)
     assert not binary_search([1, 2, 3, 4, 7], 8)
     assert not binary_search([1, 2, 3, 4, 7], -1)
+
+    assert bisect_left([1, 2, 2, 2, 7], 2) == 1
+    assert bisect_right([1, 2, 2, 2, 7], 2) == 4
+    assert equal_range([1, 2, 2, 2, 7], 2) == (1, 4)
+    assert equal_range([1, 2, 2, 2, 7], 5) == (4, 4)
+    assert search_many([1, 2, 3, 4, 7], [0, 3, 5, 8]) == [0, 2, 4, 5]
+    assert search_many([1, 2, 3, 4, 7], [8, 0, 3]) == [5, 0, 2]
+
+    eytzinger = EytzingerLayout([1, 2, 3, 4, 7])
+    assert [eytzinger.bisect_left(target) for target in [0, 1, 3, 5, 7, 8]] == [0, 0, 2, 4, 4, 5]
+    assert eytzinger.contains(4)
+    assert not eytzinger.contains(5)
+
+    assert interpolation_search([1, 2, 3, 4, 7], 4) == 3
+    assert interpolation_search([1, 2, 3, 4, 7], 5) == -1
+    assert interpolation_search(list(range(0, 10 ** 6, 3)), 999) == 333
+    assert exponential_search([1, 2, 3, 4, 7], 7) == 4
+    assert exponential_search([1, 2, 3, 4, 7], 8) == -1
+    assert exponential_search([], 1) == -1
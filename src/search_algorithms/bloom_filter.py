@@ -0,0 +1,236 @@
+"""
+Bloom filters: compact probabilistic sets that answer whether an item *may* be in a set. A negative answer is always
+correct, a positive answer is wrong with a small (configurable) probability. They can be put in front of a slower
+search, so most lookups of items that are not in the collection never reach that search.
+
+An item is added by setting k bits in a bit array of m bits, the positions are computed from two hash values
+(h1 + i * h2 for i in 0..k-1). An item may be in the set when all its k bits are set.
+"""
+import hashlib
+import math
+import numbers
+import struct
+
+HEADER = struct.Struct('<4sBQQ')
+MAGIC = b'BLMF'
+BLOCK_BITS = 512
+
+
+def normalize_number(number):
+    """
+    Converts numbers that compare equal to the same value: numbers with an integral value (bools, integral floats,
+    Fractions, Decimals, complex numbers with a zero imaginary part) become ints, other numbers that are exactly
+    representable as a float become floats. So 1, 1.0, True and Fraction(1) all get the representation of 1.
+    """
+    if isinstance(number, complex):
+        if number.imag != 0:
+            return number
+        number = number.real
+    try:
+        if number == int(number):
+            return int(number)
+        if number == float(number):
+            return float(number)
+    except (OverflowError, ValueError, TypeError):
+        pass
+    return number
+
+
+def item_to_bytes(item):
+    """
+    Deterministic byte representation of an item, so filters give the same answers in other processes.
+    Supported items are str, bytes and numbers (normalized with normalize_number, so equal numbers of different types
+    are the same item). Other items are represented by their repr, which should be equal for items that compare
+    equal, otherwise the filter can give false negatives for them.
+    """
+    if isinstance(item, bytes):
+        return item
+    if isinstance(item, str):
+        return item.encode('utf-8')
+    if isinstance(item, numbers.Number):
+        item = normalize_number(item)
+    return repr(item).encode('utf-8')
+
+
+def hash_pair(item):
+    """Two independent 64 bit hash values of item (from one blake2b digest)"""
+    digest = hashlib.blake2b(item_to_bytes(item), digest_size=16).digest()
+    return struct.unpack('<QQ', digest)
+
+
+def optimal_size(expected_items, false_positive_rate):
+    """
+    Number of bits m and number of hash functions k for the expected number of items n and false positive rate p:
+    m = -n ln(p) / ln(2)^2 and k = m / n ln(2)
+
+    :return: tuple, (m, k)
+    """
+    if not 0 < false_positive_rate < 1:
+        raise ValueError(f"False positive rate should be between 0 and 1, got {false_positive_rate}")
+    expected_items = max(expected_items, 1)
+    n_bits = max(math.ceil(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2), 8)
+    n_hashes = max(round(n_bits / expected_items * math.log(2)), 1)
+    return n_bits, n_hashes
+
+
+class BloomFilter:
+    variant = 0
+
+    def __init__(self, expected_items=1000, false_positive_rate=0.01, n_bits=None, n_hashes=None):
+        """
+
+        :param expected_items: int, number of items the filter is sized for
+        :param false_positive_rate: float, target probability of a false positive at expected_items items
+        :param n_bits: int, number of bits, overrides the size computed from expected_items and false_positive_rate
+        :param n_hashes: int, number of hash functions, overrides the computed number
+        """
+        optimal_bits, optimal_hashes = optimal_size(expected_items, false_positive_rate)
+        self.n_bits = n_bits if n_bits else optimal_bits
+        self.n_hashes = n_hashes if n_hashes else optimal_hashes
+        self.data = self._allocate()
+
+    def _allocate(self):
+        return bytearray((self.n_bits + 7) // 8)
+
+    def _positions(self, item):
+        h1, h2 = hash_pair(item)
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item):
+        for position in self._positions(item):
+            if not self.data[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def save(self, path):
+        """Writes the filter to path: a header (magic, variant, n_bits, n_hashes) followed by the raw data"""
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, self.variant, self.n_bits, self.n_hashes))
+            file.write(self.data)
+
+    @staticmethod
+    def load(path):
+        """Loads a filter written by save, returns an instance of the saved filter class"""
+        with open(path, 'rb') as file:
+            magic, variant, n_bits, n_hashes = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a bloom filter file")
+            filter_class = {cls.variant: cls for cls in (BloomFilter, CountingBloomFilter, BlockedBloomFilter)}[variant]
+            bloom_filter = filter_class(n_bits=n_bits, n_hashes=n_hashes)
+            data = file.read()
+        if len(data) != len(bloom_filter.data):
+            raise ValueError(f"{path} is truncated, expected {len(bloom_filter.data)} bytes of data")
+        bloom_filter.data = bytearray(data)
+        return bloom_filter
+
+
+class CountingBloomFilter(BloomFilter):
+    """
+    Bloom filter with an 8 bit counter instead of a bit per position, which makes it possible to remove items.
+    Counters saturate at 255 and are never decremented once saturated.
+    """
+    variant = 1
+
+    def _allocate(self):
+        return bytearray(self.n_bits)
+
+    def add(self, item):
+        for position in self._positions(item):
+            if self.data[position] < 255:
+                self.data[position] += 1
+
+    def remove(self, item):
+        """Removes an item that was added before (removing items that were not added corrupts the filter)"""
+        if item not in self:
+            raise KeyError(item)
+        for position in self._positions(item):
+            if self.data[position] < 255:
+                self.data[position] -= 1
+
+    def __contains__(self, item):
+        for position in self._positions(item):
+            if self.data[position] == 0:
+                return False
+        return True
+
+
+class BlockedBloomFilter(BloomFilter):
+    """
+    Bloom filter where all k bits of an item are in one block of BLOCK_BITS bits (one 64 byte cache line), so a
+    lookup touches a single cache line. This costs a slightly higher false positive rate for the same size.
+    """
+    variant = 2
+
+    def _allocate(self):
+        self.n_bits = max(math.ceil(self.n_bits / BLOCK_BITS), 1) * BLOCK_BITS
+        return bytearray(self.n_bits // 8)
+
+    def _positions(self, item):
+        h1, h2 = hash_pair(item)
+        block_start = (h1 % (self.n_bits // BLOCK_BITS)) * BLOCK_BITS
+        step = (h2 >> 32) | 1
+        return [block_start + (h2 + i * step) % BLOCK_BITS for i in range(self.n_hashes)]
+
+
+def bloom_prefilter(bloom_filter, search_function):
+    """
+    Wraps a search function (e.g. sequential_search or hash_search), so targets that are definitely not in the
+    bloom_filter return False without running the search.
+
+    :param bloom_filter: BloomFilter, filter containing all elements of the searched collection
+    :param search_function: Function, search_function(collection, target, *args) returning whether target is found
+    :return: Function with the same signature as search_function
+    """
+    def filtered_search(collection, target, *args, **kwargs):
+        if target not in bloom_filter:
+            return False
+        return search_function(collection, target, *args, **kwargs)
+    return filtered_search
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    from decimal import Decimal
+    from fractions import Fraction
+
+    from src.search_algorithms.sequential_search import sequential_search
+
+    words = [f"word{i}" for i in range(2000)]
+    for filter_class in (BloomFilter, CountingBloomFilter, BlockedBloomFilter):
+        bloom = filter_class(expected_items=len(words), false_positive_rate=0.01)
+        bloom.update(words)
+        assert all(word in bloom for word in words)
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'words.bloom')
+            bloom.save(path)
+            loaded = BloomFilter.load(path)
+            assert type(loaded) is filter_class and loaded.data == bloom.data
+            assert all(word in loaded for word in words)
+
+    counting = CountingBloomFilter(expected_items=10)
+    counting.add('fox')
+    counting.remove('fox')
+    assert 'fox' not in counting
+
+    search = bloom_prefilter(bloom, sequential_search)
+    assert search(words, 'word7')
+    assert not search(words, 'goat')
+
+    number_filter = BloomFilter(expected_items=10)
+    number_filter.update([1, 2.0, 3.5])
+    search = bloom_prefilter(number_filter, sequential_search)
+    assert search([1, 2.0, 3.5], 1.0) and search([1, 2.0, 3.5], True) and search([1, 2.0, 3.5], 2)
+    assert 3.5 in number_filter and 0.0 not in number_filter
+    assert item_to_bytes(Fraction(7, 2)) == item_to_bytes(Decimal('3.5')) == item_to_bytes(3.5)
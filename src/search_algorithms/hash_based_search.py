@@ -1,37 +1,268 @@
-def hash_code(element, n_bins=13):
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_BASE = 31
+DEFAULT_MODULUS = (1 << 61) - 1
+# Largest Mersenne prime modulus for which hash_packed can hash vectorized in int64
+VECTORIZED_MODULUS = (1 << 31) - 1
+
+
+def hash_code(element, n_bins=13, base=DEFAULT_BASE, modulus=DEFAULT_MODULUS):
     """
     Converts  a string element into a hash value by converting every character to its ascii value, summing all values
-    together iteratively while multiplying by 31 in every iteration.
+    together iteratively while multiplying by 31 (the base) in every iteration.
     Converted from the hashCode function here:
     https://github.com/heineman/algorithms-nutshell-2ed/blob/17bd6e9cf9917727501f9eeadbfb2100f94eede0/Figures/src/algs/chapter5/example5/SimpleString.java
+    The hash value is reduced modulo the modulus in every iteration, so it never grows beyond the modulus, also for
+    long strings.
+    As hash function of a HashTable, use n_bins=None (e.g. functools.partial(hash_code, n_bins=None)): the table needs
+    widely spread hash values, with a few bins all keys land in a few long probe sequences.
 
     :param element: str, item to be hashed
-    :param n_bins: int, Number of hash bins
-    :return: int, the absolute hash value modulo the number of bins
+    :param n_bins: int, Number of hash bins, if None the hash value is not reduced to bins
+    :param base: int, multiplier of the polynomial hash
+    :param modulus: int, modulus of the polynomial hash, defaults to the Mersenne prime 2^61 - 1
+    :return: int, the hash value modulo the number of bins
     """
     hashed_value = 0
     for char in element:
-        hashed_value = 31 * hashed_value + ord(char)
+        hashed_value = (base * hashed_value + ord(char)) % modulus
+
+    return hashed_value % n_bins if n_bins else hashed_value
+
+
+def _mersenne_61_step(hashed_values, base, codes):
+    """
+    Vectorized (hashed_values * base + codes) % (2^61 - 1) in uint64, for hashed_values < 2^61 and base, codes < 2^32.
+    hashed_values is split in 32 bit halves, so no product overflows 64 bits, and the products are reduced with
+    x % (2^61 - 1) == (x & (2^61 - 1)) + (x >> 61) (modulo 2^61 - 1).
+    """
+    modulus = np.uint64(DEFAULT_MODULUS)
+    high = (hashed_values >> np.uint64(32)) * np.uint64(base)
+    low = (hashed_values & np.uint64(0xFFFFFFFF)) * np.uint64(base)
+    low = (low & modulus) + (low >> np.uint64(61))
+    # high * 2^32 == (high >> 29) * 2^61 + (high & (2^29 - 1)) * 2^32, where 2^61 == 1 (modulo 2^61 - 1)
+    result = (high >> np.uint64(29)) + ((high & np.uint64((1 << 29) - 1)) << np.uint64(32)) + low + codes
+    result = (result & modulus) + (result >> np.uint64(61))
+    return np.where(result >= modulus, result - modulus, result)
+
+
+def hash_packed(codes, offsets, n_bins=None, base=DEFAULT_BASE, modulus=DEFAULT_MODULUS):
+    """
+    Hashes many strings stored one after the other in one buffer, string i is codes[offsets[i]:offsets[i + 1]].
+    With NumPy the strings are hashed in vectorized passes: pass p adds character p of all strings that are longer
+    than p. This works for the default modulus 2^61 - 1 (with _mersenne_61_step) and for any modulus where
+    modulus * (base + 1) fits in 63 bits, like VECTORIZED_MODULUS, so intermediate values fit in int64.
+
+    :param codes: bytes, or Iterable with int character codes
+    :param offsets: Iterable with len(strings) + 1 int start offsets, the last one is the end of the buffer
+    :param n_bins: int, Number of hash bins, if None the hash values are not reduced to bins
+    :param base: int, multiplier of the polynomial hash
+    :param modulus: int, modulus of the polynomial hash
+    :return: list of int hash values
+    """
+    mersenne = modulus == DEFAULT_MODULUS and 0 <= base < (1 << 32)
+    if np is not None and (mersenne or modulus * (base + 1) < (1 << 63)):
+        dtype = np.uint64 if mersenne else np.int64
+        codes = np.frombuffer(codes, dtype=np.uint8) if isinstance(codes, (bytes, bytearray)) else np.asarray(codes)
+        codes = codes.astype(dtype)
+        starts = np.asarray(offsets[:-1], dtype=np.int64)
+        lengths = np.asarray(offsets[1:], dtype=np.int64) - starts
+        hashed_values = np.zeros(len(starts), dtype=dtype)
+        for position in range(int(lengths.max()) if len(lengths) > 0 else 0):
+            active = lengths > position
+            active_codes = codes[starts[active] + position]
+            if mersenne:
+                hashed_values[active] = _mersenne_61_step(hashed_values[active], base, active_codes)
+            else:
+                hashed_values[active] = (hashed_values[active] * base + active_codes) % modulus
+        hashed_values = hashed_values.tolist()
+        return [hashed_value % n_bins for hashed_value in hashed_values] if n_bins else hashed_values
+
+    hashed_values = []
+    for i in range(len(offsets) - 1):
+        hashed_value = 0
+        for position in range(offsets[i], offsets[i + 1]):
+            hashed_value = (base * hashed_value + codes[position]) % modulus
+        hashed_values.append(hashed_value % n_bins if n_bins else hashed_value)
+    return hashed_values
+
+
+def hash_codes(elements, n_bins=13, base=DEFAULT_BASE, modulus=DEFAULT_MODULUS):
+    """
+    Batch version of hash_code: packs the strings in one buffer of character codes and hashes them with hash_packed.
+
+    :param elements: Iterable with str items to be hashed
+    :return: list of int hash values, equal to [hash_code(element, n_bins, base, modulus) for element in elements]
+    """
+    elements = list(elements)
+    offsets = [0]
+    for element in elements:
+        offsets.append(offsets[-1] + len(element))
+    codes = array('I')
+    codes.frombytes(''.join(elements).encode('utf-32-le'))
+    return hash_packed(codes, offsets, n_bins, base, modulus)
+
+
+EMPTY = -1
+DELETED = -2
+HASH_MASK = (1 << 63) - 1
+FIBONACCI_MULTIPLIER = 0x9E3779B97F4A7C15
 
-    return abs(hashed_value) % n_bins
+
+class HashTable:
+    def __init__(self, hash_function=hash, capacity=16, max_load_factor=0.7):
+        """
+        Hash table with open addressing and linear probing.
+        Keys, values and hashes are stored in flat arrays of size capacity (a power of two). The hash of every key is
+        stored in self.hashes (as a non-negative int), where EMPTY marks a free slot and DELETED a tombstone: a slot
+        of a removed key, that is skipped by lookups but can be reused by inserts.
+        A key is stored in the first free slot at or after its home slot. The home slot is taken from the high bits
+        of hash * FIBONACCI_MULTIPLIER, which spreads hash values that only differ in their low bits.
+        When the used slots (keys and tombstones) exceed max_load_factor * capacity, the table is rebuilt, with double
+        the capacity when the keys alone exceed half the maximum load.
+
+        :param hash_function: Function, calculates and returns an int hash value for a given key
+        :param capacity: int, initial number of slots, rounded up to a power of two
+        :param max_load_factor: float, maximum fraction of used slots
+        """
+        self.hash_function = hash_function
+        self.max_load_factor = max_load_factor
+        self.size = 0
+        self.n_deleted = 0
+        self._allocate(max(1 << (max(capacity, 2) - 1).bit_length(), 2))
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.bits = capacity.bit_length() - 1
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+        self.hashes = array('q', [EMPTY]) * capacity
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+    def __iter__(self):
+        for i in range(self.capacity):
+            if self.hashes[i] >= 0:
+                yield self.keys[i]
+
+    def _home_slot(self, hash_value):
+        return ((hash_value * FIBONACCI_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - self.bits)
+
+    def _find_slot(self, key, hash_value):
+        """Returns the slot holding key, or -1 when the key is not in the table"""
+        mask = self.capacity - 1
+        slot = self._home_slot(hash_value)
+        while True:
+            slot_hash = self.hashes[slot]
+            if slot_hash == EMPTY:
+                return -1
+            if slot_hash == hash_value and self.keys[slot] == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _resize(self, capacity):
+        old_keys, old_values, old_hashes = self.keys, self.values, self.hashes
+        self._allocate(capacity)
+        self.n_deleted = 0
+        mask = capacity - 1
+        for key, value, hash_value in zip(old_keys, old_values, old_hashes):
+            if hash_value >= 0:
+                slot = self._home_slot(hash_value)
+                while self.hashes[slot] != EMPTY:
+                    slot = (slot + 1) & mask
+                self.keys[slot] = key
+                self.values[slot] = value
+                self.hashes[slot] = hash_value
+
+    def reserve(self, n_keys):
+        """Grows the table when needed, so n_keys keys fit without exceeding max_load_factor"""
+        capacity = int(n_keys / self.max_load_factor) + 1
+        if capacity > self.capacity:
+            self._resize(1 << (capacity - 1).bit_length())
+
+    def put(self, key, value=None, hash_value=None):
+        """
+        Inserts key with value, or replaces the value when key is already in the table.
+
+        :param key: key, hashable by self.hash_function
+        :param value: value stored with the key, defaults to None
+        :param hash_value: int, precomputed self.hash_function(key)
+        """
+        hash_value = (self.hash_function(key) if hash_value is None else hash_value) & HASH_MASK
+        mask = self.capacity - 1
+        slot = self._home_slot(hash_value)
+        free_slot = -1
+        while True:
+            slot_hash = self.hashes[slot]
+            if slot_hash == EMPTY:
+                break
+            if slot_hash == DELETED:
+                if free_slot < 0:
+                    free_slot = slot
+            elif slot_hash == hash_value and self.keys[slot] == key:
+                self.values[slot] = value
+                return
+            slot = (slot + 1) & mask
+
+        if free_slot >= 0:
+            slot = free_slot
+            self.n_deleted -= 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.hashes[slot] = hash_value
+        self.size += 1
+
+        if self.size + self.n_deleted > self.max_load_factor * self.capacity:
+            grow = self.size > self.max_load_factor * self.capacity / 2
+            self._resize(self.capacity * 2 if grow else self.capacity)
+
+    def get(self, key, default=None, hash_value=None):
+        """Returns the value stored with key, or default when the key is not in the table"""
+        hash_value = (self.hash_function(key) if hash_value is None else hash_value) & HASH_MASK
+        slot = self._find_slot(key, hash_value)
+        return self.values[slot] if slot >= 0 else default
+
+    def contains(self, key, hash_value=None):
+        """Whether key is in the table, hash_value can be given when it is already computed"""
+        hash_value = (self.hash_function(key) if hash_value is None else hash_value) & HASH_MASK
+        return self._find_slot(key, hash_value) >= 0
+
+    def remove(self, key):
+        """Removes key from the table by replacing it with a tombstone, raises a KeyError when key is not found"""
+        slot = self._find_slot(key, self.hash_function(key) & HASH_MASK)
+        if slot < 0:
+            raise KeyError(key)
+        self.keys[slot] = None
+        self.values[slot] = None
+        self.hashes[slot] = DELETED
+        self.size -= 1
+        self.n_deleted += 1
 
 
 def create_hash_table(collection, hash_function):
     """
-    Converts a collection of elements to a hash table using the hash_function, where elements from the collection
-    are stored under their hash value. A single hash value can contain multiple elements.
+    Converts a collection of elements to a HashTable using the hash_function.
+    The hash function should spread its values over a large range (e.g. hash_code with n_bins=None), the table
+    reduces the hash values to slots itself.
 
     :param collection: Iterable, list with elements of a type that can be hashed by the hash_function
     :param hash_function: Function, calculates and returns the hash value for a given element
-    :return: dict, dictionary with hash values as keys and collection items listed as values
+    :return: HashTable, table with the elements of the collection as keys
     """
-    table = {}
+    table = HashTable(hash_function)
+    if hasattr(collection, '__len__'):
+        table.reserve(len(collection))
     for element in collection:
-        hash_value = hash_function(element)
-        if hash_value not in table.keys():
-            table[hash_value] = [element]
-        else:
-            table[hash_value].append(element)
+        table.put(element)
     return table
 
 
@@ -40,21 +271,46 @@ def hash_search(hash_table, target, hash_function):
     Searches a hash_table for the target value by converting the target value to it's hash value, calculated by
     the hash_function, and looking it up in the hash_table. Returns whether the target is present in the hash table
 
-    :param hash_table: dict, dictionary with hash values as keys and collection items listed as values
+    :param hash_table: HashTable, table created by create_hash_table
     :param target: target value, the type should be hashable by the hash_function
     :param hash_function: function, takes a value as input and returns the hash value
     :return: bool, Whether the target is found
     """
-    target_found = False
-    hash_value = hash_function(target)
-    if hash_value in hash_table.keys():
-        if target in hash_table[hash_value]:
-            target_found = True
-    return target_found
+    return hash_table.contains(target, hash_function(target))
 
 
 if __name__ == '__main__':
+    import functools
+
     list_of_words = ["the", "quick", "brown", "fox", "jumps", "over", "the", "lazy", "dog"]
     hash_table = create_hash_table(list_of_words, hash_code)
     assert hash_search(hash_table, 'fox', hash_code)
     assert not hash_search(hash_table, 'alphabet', hash_code)
+
+    table = HashTable()
+    for word in list_of_words:
+        table.put(word, len(word))
+    assert len(table) == 8
+    assert table.get('quick') == 5
+    table.remove('quick')
+    assert 'quick' not in table
+    assert table.get('quick', -1) == -1
+    assert sorted(table) == sorted(set(list_of_words) - {'quick'})
+
+    assert hash_code('fox') == (31 * (31 * ord('f') + ord('o')) + ord('x')) % 13
+    assert hash_codes(list_of_words) == [hash_code(word) for word in list_of_words]
+    assert hash_packed(b'thefox', [0, 3, 6], n_bins=13) == [hash_code('the', 13), hash_code('fox', 13)]
+    long_words = ['a' * 40, 'z' * 100, '', 'fox']
+    packed = ''.join(long_words).encode()
+    offsets = [0, 40, 140, 140, 143]
+    for modulus in (DEFAULT_MODULUS, VECTORIZED_MODULUS):
+        expected = [hash_code(word, None, modulus=modulus) for word in long_words]
+        assert hash_packed(packed, offsets, modulus=modulus) == expected
+        assert all(type(hash_value) is int for hash_value in hash_codes(long_words, None, modulus=modulus))
+
+    many_words = [f"word{i}" for i in range(20000)]
+    full_hash_code = functools.partial(hash_code, n_bins=None)
+    hash_table = create_hash_table(many_words, full_hash_code)
+    assert hash_table.capacity == 32768 and len({full_hash_code(word) for word in many_words}) == len(many_words)
+    assert all(hash_search(hash_table, word, full_hash_code) for word in many_words[::100])
+    assert not hash_search(hash_table, 'word20000', full_hash_code)
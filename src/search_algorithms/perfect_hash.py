@@ -0,0 +1,264 @@
+"""
+Minimal perfect hashing for static key sets with CHD (compress, hash and displace).
+A minimal perfect hash function maps the n keys of a fixed set to the indices 0..n-1 without collisions, so a lookup
+needs exactly one probe.
+
+Every key gets three hash values h, f1 and f2. The keys are divided over n / bucket_size buckets by h and placed in
+n / LOAD_FACTOR slots, slightly more than n. Buckets are placed from large to small: for every bucket the displacement
+pairs (d0, d1) with d0, d1 < DISPLACEMENT_RANGE are tried, where a key is placed at slot (f1 + d0 * f2 + d1) % n_slots,
+until all keys of the bucket land in free slots. The few free slots that remain keep the last buckets placeable with
+small displacements, so d0 and d1 are stored in two byte arrays: 16 bits per bucket.
+The index of a key is the rank of its slot, the number of occupied slots before it. The occupied slots are stored as a
+bitmap of 64 bit words, with the number of occupied slots before every word. With the default bucket_size of 5, the
+hash function takes under 5 bits per key: 3.2 for the displacements, about 1 for the bitmap and at most 0.5 for the
+ranks.
+
+The keys are stored packed in one bytes buffer with an offset array, in index order, to check membership of unknown
+keys.
+"""
+import hashlib
+import struct
+from array import array
+
+HEADER = struct.Struct('<4sQQQQ?')
+MAGIC = b'CHD2'
+MAX_SALTS = 32
+# Keys per slot: the few free slots let the last (small) buckets find a displacement pair within the small range
+LOAD_FACTOR = 0.99
+# Displacements d0 and d1 are lower than this, so every bucket stores two bytes
+DISPLACEMENT_RANGE = 256
+WORD_BITS = 64
+
+
+def key_hashes(key, salt):
+    """Three 64 bit hash values (h, f1, f2) of a bytes key for the given salt"""
+    digest = hashlib.blake2b(key, digest_size=24, salt=salt.to_bytes(16, 'little')).digest()
+    return struct.unpack('<QQQ', digest)
+
+
+def compact_array(values):
+    """Stores non-negative ints in an array with the smallest unsigned typecode they fit in"""
+    maximum = max(values, default=0)
+    for typecode in 'BHIQ':
+        if maximum < 1 << (8 * array(typecode).itemsize):
+            return array(typecode, values)
+    raise OverflowError(f"{maximum} does not fit in 64 bits")
+
+
+class MinimalPerfectHash:
+    def __init__(self, keys=None, bucket_size=5):
+        """
+        Builds the perfect hash function for a set of unique str or bytes keys.
+
+        :param keys: Iterable with unique keys, all str or all bytes
+        :param bucket_size: float, average number of keys per bucket (more keys per bucket: less memory for the
+            displacements, but a slower build)
+        """
+        self.n = 0
+        self.n_slots = 1
+        self.n_buckets = 1
+        self.salt = 0
+        self.d0 = array('B', [0])
+        self.d1 = array('B', [0])
+        self.occupied = array('Q', [0])
+        self.ranks = array('B', [0])
+        self.offsets = array('Q', [0])
+        self.key_data = b''
+        self.str_keys = False
+        if keys is not None:
+            self._build(list(keys), bucket_size)
+
+    def _to_bytes(self, key):
+        return key.encode('utf-8') if isinstance(key, str) else key
+
+    def _build(self, keys, bucket_size):
+        if len(keys) == 0:
+            return
+        self.str_keys = isinstance(keys[0], str)
+        byte_keys = [self._to_bytes(key) for key in keys]
+        if len(set(byte_keys)) != len(byte_keys):
+            raise ValueError("Keys of a perfect hash function should be unique")
+
+        self.n = len(byte_keys)
+        self.n_slots = int(self.n / LOAD_FACTOR) + 1
+        self.n_buckets = max(int(self.n / bucket_size), 1)
+        for salt in range(MAX_SALTS):
+            placement = self._place(byte_keys, salt)
+            if placement is not None:
+                break
+        else:
+            raise RuntimeError(f"Could not build a perfect hash function within {MAX_SALTS} salts")
+
+        self.salt = salt
+        displacements, occupied = placement
+        self.d0 = array('B', [d0 for d0, _ in displacements])
+        self.d1 = array('B', [d1 for _, d1 in displacements])
+        self.occupied = array('Q', [0]) * (-(-self.n_slots // WORD_BITS))
+        for slot in range(self.n_slots):
+            if occupied[slot]:
+                self.occupied[slot // WORD_BITS] |= 1 << (slot % WORD_BITS)
+        ranks = [0]
+        for word in self.occupied[:-1]:
+            ranks.append(ranks[-1] + bin(word).count('1'))
+        self.ranks = compact_array(ranks)
+
+        rank_keys = [b''] * self.n
+        for key in byte_keys:
+            rank_keys[self._rank(self._slot(key))] = key
+        offsets = [0]
+        for key in rank_keys:
+            offsets.append(offsets[-1] + len(key))
+        self.offsets = compact_array(offsets)
+        self.key_data = b''.join(rank_keys)
+
+    def _place(self, byte_keys, salt):
+        """
+        Finds a displacement pair (d0, d1) for every bucket, largest buckets first. Returns the pairs and the occupied
+        slots, or None when a bucket can not be placed with displacements lower than DISPLACEMENT_RANGE (or two of its
+        keys can never be separated), in which case a different salt is tried.
+        """
+        n_slots = self.n_slots
+        buckets = [[] for _ in range(self.n_buckets)]
+        for key in byte_keys:
+            h, f1, f2 = key_hashes(key, salt)
+            buckets[h % self.n_buckets].append((f1 % n_slots, f2 % n_slots))
+
+        displacements = [(0, 0)] * self.n_buckets
+        occupied = bytearray(n_slots)
+        order = sorted(range(self.n_buckets), key=lambda bucket: len(buckets[bucket]), reverse=True)
+        for bucket in order:
+            bucket_hashes = buckets[bucket]
+            if len(bucket_hashes) == 0:
+                break
+            if len(set(bucket_hashes)) != len(bucket_hashes):
+                return None
+            displacement = self._find_displacement(bucket_hashes, occupied)
+            if displacement is None:
+                return None
+            displacements[bucket] = displacement
+        return displacements, occupied
+
+    def _find_displacement(self, bucket_hashes, occupied):
+        """
+        Returns the first pair (d0, d1) that puts all keys of the bucket in free slots, and marks those slots.
+        For a given d0 the slots of the keys of a bucket have fixed distances to the slot of the first key, so d1 only
+        moves the whole bucket: d1 values that put the first key in an occupied slot are skipped right away.
+        """
+        n_slots = self.n_slots
+        for d0 in range(DISPLACEMENT_RANGE):
+            base = (bucket_hashes[0][0] + d0 * bucket_hashes[0][1]) % n_slots
+            distances = [(f1 + d0 * f2 - base) % n_slots for f1, f2 in bucket_hashes[1:]]
+            if 0 in distances or len(set(distances)) != len(distances):
+                continue
+            for d1 in range(DISPLACEMENT_RANGE):
+                slot = (base + d1) % n_slots
+                if occupied[slot]:
+                    continue
+                slots = [(slot + distance) % n_slots for distance in distances]
+                if not any(occupied[other_slot] for other_slot in slots):
+                    occupied[slot] = 1
+                    for other_slot in slots:
+                        occupied[other_slot] = 1
+                    return d0, d1
+        return None
+
+    def _slot(self, byte_key):
+        """Slot (0..n_slots - 1) of byte_key"""
+        h, f1, f2 = key_hashes(byte_key, self.salt)
+        bucket = h % self.n_buckets
+        return (f1 % self.n_slots + self.d0[bucket] * (f2 % self.n_slots) + self.d1[bucket]) % self.n_slots
+
+    def _is_occupied(self, slot):
+        return self.occupied[slot // WORD_BITS] >> (slot % WORD_BITS) & 1 == 1
+
+    def _rank(self, slot):
+        """Number of occupied slots before slot: the index of the key in slot"""
+        word = slot // WORD_BITS
+        return self.ranks[word] + bin(self.occupied[word] & ((1 << (slot % WORD_BITS)) - 1)).count('1')
+
+    def __len__(self):
+        return self.n
+
+    def index(self, key):
+        """
+        Index (0..n-1) of key. Every key of the set has its own index, other keys are mapped to an arbitrary index.
+        """
+        if self.n == 0:
+            raise KeyError(key)
+        return min(self._rank(self._slot(self._to_bytes(key))), self.n - 1)
+
+    def get_key(self, index):
+        """Returns the key with the given index"""
+        key = self.key_data[self.offsets[index]:self.offsets[index + 1]]
+        return key.decode('utf-8') if self.str_keys else key
+
+    def __contains__(self, key):
+        if self.n == 0:
+            return False
+        byte_key = self._to_bytes(key)
+        slot = self._slot(byte_key)
+        if not self._is_occupied(slot):
+            return False
+        index = self._rank(slot)
+        return self.key_data[self.offsets[index]:self.offsets[index + 1]] == byte_key
+
+    def hash_bits_per_key(self):
+        """Bits per key of the hash function itself (displacements, occupied slots and ranks), without the keys"""
+        arrays = (self.d0, self.d1, self.occupied, self.ranks)
+        return 8 * sum(len(values) * values.itemsize for values in arrays) / max(self.n, 1)
+
+    def save(self, path):
+        """Writes the hash function and keys to path: header, d0, d1, occupied slots, ranks, offsets, key data"""
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, self.n, self.n_slots, self.n_buckets, self.salt, self.str_keys))
+            file.write(self.ranks.typecode.encode() + self.offsets.typecode.encode())
+            for values in (self.d0, self.d1, self.occupied, self.ranks, self.offsets):
+                values.tofile(file)
+            file.write(self.key_data)
+
+    @staticmethod
+    def load(path):
+        """Loads a perfect hash function written by save"""
+        perfect_hash = MinimalPerfectHash()
+        with open(path, 'rb') as file:
+            magic, n, n_slots, n_buckets, salt, str_keys = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a perfect hash file")
+            rank_typecode, offset_typecode = file.read(2).decode()
+            perfect_hash.n = n
+            perfect_hash.n_slots = n_slots
+            perfect_hash.n_buckets = n_buckets
+            perfect_hash.salt = salt
+            perfect_hash.str_keys = str_keys
+            n_words = -(-n_slots // WORD_BITS)
+            for name, typecode, length in [('d0', 'B', n_buckets), ('d1', 'B', n_buckets), ('occupied', 'Q', n_words),
+                                           ('ranks', rank_typecode, n_words), ('offsets', offset_typecode, n + 1)]:
+                values = array(typecode)
+                values.fromfile(file, length)
+                setattr(perfect_hash, name, values)
+            perfect_hash.key_data = file.read()
+        return perfect_hash
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+
+    words = [f"word{i}" for i in range(5000)]
+    perfect_hash = MinimalPerfectHash(words)
+    assert sorted(perfect_hash.index(word) for word in words) == list(range(len(words)))
+    assert all(word in perfect_hash for word in words)
+    assert 'goat' not in perfect_hash
+    assert perfect_hash.get_key(perfect_hash.index('word42')) == 'word42'
+    assert perfect_hash.d0.typecode == perfect_hash.d1.typecode == 'B' and perfect_hash.hash_bits_per_key() < 5
+    assert all(0 <= perfect_hash.index(f"other{i}") < len(words) for i in range(100))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'words.mph')
+        perfect_hash.save(path)
+        loaded = MinimalPerfectHash.load(path)
+        assert all(loaded.index(word) == perfect_hash.index(word) for word in words)
+        assert 'goat' not in loaded
+
+    assert 'fox' not in MinimalPerfectHash([])
+    assert MinimalPerfectHash([b'fox']).index(b'fox') == 0
@@ -0,0 +1,87 @@
+"""
+Rabin-Karp substring search with a rolling polynomial hash.
+The hash of every window of the text is computed from the hash of the previous window in O(1): the character
+leaving the window is subtracted (times base^(window - 1)), the rest is multiplied by the base and the character
+entering the window is added. Windows are only compared with a pattern when their hashes are equal.
+"""
+from src.search_algorithms.hash_based_search import DEFAULT_BASE, DEFAULT_MODULUS
+
+
+class RollingHash:
+    def __init__(self, window, base=DEFAULT_BASE, modulus=DEFAULT_MODULUS):
+        """
+        Polynomial hash over a sliding window of a fixed size, same hash values as hash_code(window, n_bins=modulus).
+
+        :param window: int, number of characters in the window
+        :param base: int, multiplier of the polynomial hash
+        :param modulus: int, modulus of the polynomial hash
+        """
+        self.window = window
+        self.base = base
+        self.modulus = modulus
+        self.leading_power = pow(base, window - 1, modulus) if window > 0 else 0
+
+    def hash(self, text, start=0):
+        """Hash of text[start:start + window]"""
+        hashed_value = 0
+        for i in range(start, start + self.window):
+            hashed_value = (self.base * hashed_value + ord(text[i])) % self.modulus
+        return hashed_value
+
+    def roll(self, hashed_value, leaving_char, entering_char):
+        """Hash of the window moved one character to the right"""
+        hashed_value = (hashed_value - ord(leaving_char) * self.leading_power) % self.modulus
+        return (hashed_value * self.base + ord(entering_char)) % self.modulus
+
+    def windows(self, text):
+        """Generator that yields (start, hash) for every window in text"""
+        if self.window == 0 or len(text) < self.window:
+            return
+        hashed_value = self.hash(text)
+        yield 0, hashed_value
+        for start in range(1, len(text) - self.window + 1):
+            hashed_value = self.roll(hashed_value, text[start - 1], text[start + self.window - 1])
+            yield start, hashed_value
+
+
+def rabin_karp(text, patterns, base=DEFAULT_BASE, modulus=DEFAULT_MODULUS):
+    """
+    Finds all occurrences of several patterns in text.
+    Patterns are grouped by length, for every length the text is scanned once with a RollingHash, and the hash of
+    every window is looked up in a dict with the hashes of the patterns of that length.
+
+    :param text: str, text to search in
+    :param patterns: Iterable with non-empty str patterns
+    :param base: int, multiplier of the polynomial hash
+    :param modulus: int, modulus of the polynomial hash
+    :return: dict, pattern -> list of start indices of the pattern in text (in increasing order)
+    """
+    matches = {pattern: [] for pattern in patterns}
+    patterns_by_length = {}
+    for pattern in matches.keys():
+        if len(pattern) == 0:
+            raise ValueError("Patterns should not be empty")
+        patterns_by_length.setdefault(len(pattern), []).append(pattern)
+
+    for length, length_patterns in patterns_by_length.items():
+        rolling_hash = RollingHash(length, base, modulus)
+        pattern_hashes = {}
+        for pattern in length_patterns:
+            pattern_hashes.setdefault(rolling_hash.hash(pattern), []).append(pattern)
+
+        for start, hashed_value in rolling_hash.windows(text):
+            if hashed_value in pattern_hashes:
+                for pattern in pattern_hashes[hashed_value]:
+                    if text.startswith(pattern, start):
+                        matches[pattern].append(start)
+    return matches
+
+
+if __name__ == '__main__':
+    from src.search_algorithms.hash_based_search import hash_code
+
+    text = "the quick brown fox jumps over the lazy dog"
+    assert RollingHash(3).hash(text, 16) == hash_code('fox', n_bins=DEFAULT_MODULUS)
+    assert rabin_karp(text, ['the', 'fox', 'o', 'cat']) == {'the': [0, 31], 'fox': [16], 'o': [12, 17, 26, 41],
+                                                            'cat': []}
+    assert rabin_karp("aaaa", ['aa'], modulus=7) == {'aa': [0, 1, 2]}
@@ -1,3 +1,30 @@
+"""
+Sequential search, plus a chunked scan engine for large unsorted collections and streams.
+The collection is split into chunks. Chunks of numeric (NumPy, array.array) or bytes data are scanned with vectorized
+(C level) comparisons in the current process: those scans are limited by memory bandwidth, and sending the chunks to
+other processes would copy every element once more. Chunks of object data can be scanned by a pool of processes, that
+share a cancellation value: the lowest index found so far. Workers stop scanning a chunk as soon as a match before
+that chunk is known, and no new chunks are handed out after it.
+"""
+import functools
+import itertools
+import multiprocessing
+import operator
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NOT_FOUND = (1 << 63) - 1
+CANCELLATION_CHECK_INTERVAL = 1024
+
+_found_at = None
+
+
 def sequential_search(collection, target):
     """
     Checks whether the target exists in the collection. If so, returns True, else returns False
@@ -12,7 +39,201 @@ def sequential_search(collection, target):
     return False
 
 
+def _init_worker(found_at):
+    """Process pool initializer, stores the shared lowest found index"""
+    global _found_at
+    _found_at = found_at
+
+
+def _report_found(index):
+    if _found_at is not None:
+        with _found_at.get_lock():
+            if index < _found_at.value:
+                _found_at.value = index
+
+
+def _cancelled(start):
+    """Whether a match before start has been found by another worker"""
+    return _found_at is not None and _found_at.value < start
+
+
+def _vectorizable(chunk, target):
+    """Whether chunk is a NumPy array, array.array or bytes (with an int target) that _vectorized_scan can scan"""
+    if np is not None and isinstance(chunk, np.ndarray):
+        return True
+    return isinstance(chunk, array) or (isinstance(chunk, (bytes, bytearray)) and isinstance(target, int))
+
+
+def _vectorized_scan(chunk, start, target, mode):
+    """Scans a NumPy, array.array or bytes chunk with C level comparisons, returns None for other chunks"""
+    if not _vectorizable(chunk, target):
+        return None
+    if isinstance(chunk, (bytes, bytearray)) and not 0 <= target <= 255:
+        # No byte can equal an int outside of the byte range (count and index would raise a ValueError)
+        return {'first': -1, 'count': 0, 'all': []}[mode]
+
+    if np is not None and isinstance(chunk, np.ndarray):
+        matches = np.flatnonzero(chunk == target)
+        if mode == 'first':
+            return start + int(matches[0]) if len(matches) > 0 else -1
+        if mode == 'count':
+            return len(matches)
+        return (matches + start).tolist()
+
+    if mode == 'count':
+        return chunk.count(target)
+    indices = []
+    position = 0
+    while True:
+        try:
+            position = chunk.index(target, position)
+        except ValueError:
+            break
+        if mode == 'first':
+            return start + position
+        indices.append(start + position)
+        position += 1
+    return -1 if mode == 'first' else indices
+
+
+def _scan_chunk(chunk, start, target, predicate, mode):
+    """
+    Scans one chunk, whose first element has index start in the collection.
+
+    :param mode: str, 'first' returns the index of the first match or -1, 'all' returns a list with the indices of
+        all matches and 'count' returns the number of matches
+    """
+    if predicate is None:
+        result = _vectorized_scan(chunk, start, target, mode)
+        if result is not None:
+            if mode == 'first' and result >= 0:
+                _report_found(result)
+            return result
+        predicate = functools.partial(operator.eq, target)
+
+    indices = []
+    n_matches = 0
+    for offset, element in enumerate(chunk):
+        if mode == 'first' and offset % CANCELLATION_CHECK_INTERVAL == 0 and _cancelled(start):
+            return -1
+        if predicate(element):
+            if mode == 'first':
+                _report_found(start + offset)
+                return start + offset
+            n_matches += 1
+            if mode == 'all':
+                indices.append(start + offset)
+    if mode == 'first':
+        return -1
+    return n_matches if mode == 'count' else indices
+
+
+def _chunks(collection, chunk_size):
+    """Yields (start, chunk) tuples, slices for sequences and lists of elements for other iterables"""
+    if hasattr(collection, '__len__') and hasattr(collection, '__getitem__'):
+        for start in range(0, len(collection), chunk_size):
+            yield start, collection[start:start + chunk_size]
+    else:
+        iterator = iter(collection)
+        start = 0
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if len(chunk) == 0:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+
+def _combine(results, mode):
+    if mode == 'first':
+        found = [result for result in results if result >= 0]
+        return min(found) if found else -1
+    if mode == 'count':
+        return sum(results)
+    return [index for result in results for index in result]
+
+
+def scan(collection, target=None, predicate=None, mode='first', workers=1, chunk_size=65536):
+    """
+    Scans collection chunk by chunk for elements equal to target, or for which predicate(element) is True.
+
+    With workers > 1 the chunks are scanned by a process pool (the predicate should then be a picklable, top level
+    function). At most 2 * workers chunks are in flight, so streams are not read ahead further than that. In 'first'
+    mode the lowest found index is shared between the workers, which stop as soon as a match before their chunk exists.
+    NumPy arrays, array.array and bytes searched for a target are always scanned vectorized in the current process.
+
+    :param collection: Iterable, Collection of elements (sequence, NumPy array, array.array, bytes or any iterable)
+    :param target: Value to search for, ignored when predicate is given
+    :param predicate: Function, returns True for the elements that are searched for
+    :param mode: str, 'first', 'all' or 'count', see _scan_chunk
+    :param workers: int, number of processes
+    :param chunk_size: int, number of elements per chunk
+    :return: int index of the first match (-1 if not found), list of indices or int count, depending on mode
+    """
+    if mode not in ('first', 'all', 'count'):
+        raise ValueError(f"Unknown scan mode '{mode}', choose from 'first', 'all' or 'count'")
+
+    results = []
+    if workers <= 1 or (predicate is None and _vectorizable(collection, target)):
+        for start, chunk in _chunks(collection, chunk_size):
+            result = _scan_chunk(chunk, start, target, predicate, mode)
+            if mode == 'first' and result >= 0:
+                return result
+            results.append(result)
+        return _combine(results, mode)
+
+    found_at = multiprocessing.Value('q', NOT_FOUND)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(found_at,)) as executor:
+        pending = deque()
+        for start, chunk in _chunks(collection, chunk_size):
+            if mode == 'first' and found_at.value < start:
+                break
+            pending.append(executor.submit(_scan_chunk, chunk, start, target, predicate, mode))
+            while len(pending) >= 2 * workers:
+                results.append(pending.popleft().result())
+        results.extend(future.result() for future in pending)
+    return _combine(results, mode)
+
+
+def find_first(collection, target=None, predicate=None, workers=1, chunk_size=65536):
+    """Index of the first element equal to target (or matching predicate), -1 if there is none. See scan"""
+    return scan(collection, target, predicate, 'first', workers, chunk_size)
+
+
+def find_all(collection, target=None, predicate=None, workers=1, chunk_size=65536):
+    """List with the indices of all elements equal to target (or matching predicate). See scan"""
+    return scan(collection, target, predicate, 'all', workers, chunk_size)
+
+
+def count(collection, target=None, predicate=None, workers=1, chunk_size=65536):
+    """Number of elements equal to target (or matching predicate). See scan"""
+    return scan(collection, target, predicate, 'count', workers, chunk_size)
+
+
+def _is_negative(value):
+    return value < 0
+
+
 if __name__ == '__main__':
     assert sequential_search([3, 4, 2, 7, 1], 7)
     assert sequential_search(["Dog", "Cat", "Mouse"], "Dog")
     assert not sequential_search(["Dog", "Cat", "Mouse"], "Goat")
+
+    values = list(range(10000)) * 2
+    assert find_first(values, 9999, chunk_size=1000) == 9999
+    assert find_first(iter(values), 9999, chunk_size=1000) == 9999
+    assert find_first(values, -5) == -1
+    assert find_first(values, 5.0) == 5
+    assert find_all(values, 5, chunk_size=333) == [5, 10005]
+    assert count(array('q', values), 7, chunk_size=777) == 2
+    assert find_all(array('q', values), 7, chunk_size=777) == [7, 10007]
+    assert find_first(bytes([1, 2, 3, 4]), 3) == 2
+    assert count(b'abc', 300) == 0 and find_first(bytearray(b'abc'), -1) == -1 and find_all(b'abc', 256) == []
+    assert count(values, predicate=lambda value: value % 1000 == 0) == 20
+
+    assert find_first(values, 12345 % 10000, workers=2, chunk_size=1000) == 2345
+    assert find_all(values, 5, workers=2, chunk_size=1000) == [5, 10005]
+    assert count(values + [-1, -2], predicate=_is_negative, workers=2, chunk_size=1000) == 2
+    assert find_first(values, -5, workers=2, chunk_size=1000) == -1
+    assert find_first(array('q', values), 9999, workers=2, chunk_size=1000) == 9999
+    assert count(bytes(values[:256]) * 4, 7, workers=2, chunk_size=100) == 4
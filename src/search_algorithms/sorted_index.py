@@ -0,0 +1,144 @@
+"""
+On-disk sorted index that is searched through a memory map.
+
+File format (little endian):
+- header: magic b'SIDX', format version, key struct format (padded to 16 bytes), number of keys, payload flag
+- keys: n fixed width keys in sorted order
+- payload offsets (optional): n unsigned 64 bit integers, e.g. offsets of the records of the keys in a data file
+
+The reader maps the file and unpacks only the keys that binary search probes, so opening an index is near instant
+whatever its size, and processes that open the same index share its pages through the page cache.
+"""
+import mmap
+import shutil
+import struct
+import tempfile
+
+from src.search_algorithms.binary_search import binary_search, bisect_left
+
+HEADER = struct.Struct('<4sH16sQ?')
+MAGIC = b'SIDX'
+VERSION = 1
+PAYLOAD = struct.Struct('<Q')
+
+
+def write_sorted_index(path, sorted_items, key_format='<q', with_payload=False):
+    """
+    Writes an index file from an iterator of sorted keys, without holding the keys in memory.
+
+    :param path: str, path of the index file
+    :param sorted_items: Iterable with keys in sorted order, or (key, payload_offset) tuples when with_payload is True
+    :param key_format: str, struct format of a single key, e.g. '<q' (64 bit int), '<d' (double) or '16s' (bytes)
+    :param with_payload: bool, whether a payload offset is stored for every key
+    :return: int, number of keys written
+    """
+    key_struct = struct.Struct(key_format)
+    n_keys = 0
+    previous_key = None
+    # Payload offsets go after all keys, they are spilled to a temporary file while the keys are written
+    with open(path, 'wb') as file, tempfile.TemporaryFile() as payload_file:
+        file.write(HEADER.pack(MAGIC, VERSION, key_format.encode(), 0, with_payload))
+        for item in sorted_items:
+            key, payload = item if with_payload else (item, None)
+            if previous_key is not None and key < previous_key:
+                raise ValueError(f"Keys are not sorted: {key} comes after {previous_key}")
+            file.write(key_struct.pack(key))
+            if with_payload:
+                payload_file.write(PAYLOAD.pack(payload))
+            previous_key = key
+            n_keys += 1
+
+        payload_file.seek(0)
+        shutil.copyfileobj(payload_file, file)
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, key_format.encode(), n_keys, with_payload))
+    return n_keys
+
+
+class SortedIndex:
+    def __init__(self, path):
+        """
+        Opens an index file written by write_sorted_index. The index behaves as a read only sorted sequence of keys
+        (len and indexing), so the functions in binary_search can be used on it directly.
+
+        :param path: str, path of the index file
+        """
+        self.file = open(path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, key_format, self.n_keys, self.with_payload = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a sorted index file (version {VERSION})")
+        self.key_struct = struct.Struct(key_format.rstrip(b'\0').decode())
+        self.keys_offset = HEADER.size
+        self.payload_offset = self.keys_offset + self.n_keys * self.key_struct.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.n_keys
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.n_keys
+        if not 0 <= index < self.n_keys:
+            raise IndexError("SortedIndex index out of range")
+        return self.key_struct.unpack_from(self.buffer, self.keys_offset + index * self.key_struct.size)[0]
+
+    def _normalize(self, target):
+        """Pads bytes targets with null bytes to the key width, as struct does when packing keys"""
+        if isinstance(target, bytes):
+            return target.ljust(self.key_struct.size, b'\0')
+        return target
+
+    def contains(self, target):
+        return binary_search(self, self._normalize(target))
+
+    def find(self, target):
+        """Returns the index of target in the index, or -1 if it's not found"""
+        target = self._normalize(target)
+        position = bisect_left(self, target)
+        return position if position < self.n_keys and self[position] == target else -1
+
+    def get_payload(self, index):
+        """Returns the payload offset stored for the key at index"""
+        if not self.with_payload:
+            raise ValueError("The index has no payload offsets")
+        if not 0 <= index < self.n_keys:
+            raise IndexError("SortedIndex index out of range")
+        return PAYLOAD.unpack_from(self.buffer, self.payload_offset + index * PAYLOAD.size)[0]
+
+
+if __name__ == '__main__':
+    import os
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = os.path.join(directory, 'keys.idx')
+        assert write_sorted_index(index_path, range(0, 20000, 2)) == 10000
+        with SortedIndex(index_path) as index:
+            assert len(index) == 10000
+            assert index.contains(1234)
+            assert not index.contains(1235)
+            assert index.find(1234) == 617
+            assert index[-1] == 19998
+
+        words = sorted([b'brown', b'dog', b'fox', b'lazy', b'quick'])
+        write_sorted_index(index_path, ((word, i * 100) for i, word in enumerate(words)), key_format='8s',
+                           with_payload=True)
+        with SortedIndex(index_path) as index:
+            assert index.get_payload(index.find(b'fox')) == 200
+            assert index.find(b'cat') == -1
+
+        try:
+            write_sorted_index(index_path, [3, 1, 2])
+            assert False, "Expected a ValueError for unsorted keys"
+        except ValueError:
+            pass
@@ -0,0 +1,194 @@
+"""
+Adaptive sort that makes use of order that already exists in the input.
+The values are scanned once for natural runs (non-descending or strictly descending sequences). Depending on how
+much of the input is covered by long runs, the values are either merged run by run, or sorted from scratch.
+
+Strategies:
+- 'sorted': the input is one (ascending or descending) run, at most a reversal is needed
+- 'insertion': small inputs are insertion sorted
+- 'merge': most values are in long runs, short runs are sorted into blocks and all runs are merged with galloping
+- 'quick': little existing order (random data), the values are sorted with introsort
+"""
+from bisect import bisect_left, bisect_right
+
+from src.sorting_algorithms.insertion_sort import insertion_sort_range
+from src.sorting_algorithms.key_sort import sort_by_key
+from src.sorting_algorithms.quick_sort import introsort
+
+MIN_GALLOP = 7
+
+
+def find_runs(values):
+    """
+    Scans values once for natural runs. Strictly descending runs are reversed in place (strictly, so reversing never
+    changes the order of equal values), so all returned runs are non-descending.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :return: list, (start, end) tuples of the runs, end is exclusive
+    """
+    runs = []
+    n = len(values)
+    start = 0
+    while start < n:
+        end = start + 1
+        if end < n and values[end] < values[start]:
+            while end < n and values[end] < values[end - 1]:
+                end += 1
+            values[start:end] = values[start:end][::-1]
+        else:
+            while end < n and not values[end] < values[end - 1]:
+                end += 1
+        runs.append((start, end))
+        start = end
+    return runs
+
+
+def presortedness(runs, n, min_run=32):
+    """Fraction of the n values that are in runs with at least min_run values"""
+    if n == 0:
+        return 1.0
+    return sum(end - start for start, end in runs if end - start >= min_run) / n
+
+
+def collapse_short_runs(values, runs, min_run=32):
+    """
+    Consecutive runs shorter than min_run are joined into one block, which is sorted with introsort.
+    Long runs are kept as they are.
+
+    :return: list, (start, end) tuples of sorted runs
+    """
+    collapsed = []
+    block_start = None
+    for start, end in runs:
+        if end - start >= min_run:
+            if block_start is not None:
+                introsort(values, block_start, start - 1)
+                collapsed.append((block_start, start))
+                block_start = None
+            collapsed.append((start, end))
+        elif block_start is None:
+            block_start = start
+    if block_start is not None:
+        introsort(values, block_start, runs[-1][1] - 1)
+        collapsed.append((block_start, runs[-1][1]))
+    return collapsed
+
+
+def galloping_merge(values, lo, mid, hi):
+    """
+    Stable in place merge of the sorted runs values[lo:mid] and values[mid:hi].
+
+    Values of the left run that are not greater than the first value of the right run, and values of the right run
+    that are not lower than the last value of the left run, are already in place and are skipped (found with binary
+    search). During the merge, when one run wins MIN_GALLOP times in a row, the merge switches to galloping: the
+    number of values to take from that run is found by binary search and copied in one slice.
+    """
+    lo = bisect_right(values, values[mid], lo, mid)
+    hi = bisect_left(values, values[mid - 1], mid, hi)
+    if lo >= mid or mid >= hi:
+        return values
+
+    left = values[lo:mid]
+    i = 0
+    j = mid
+    k = lo
+    left_wins = 0
+    right_wins = 0
+    while i < len(left) and j < hi:
+        if values[j] < left[i]:
+            values[k] = values[j]
+            j += 1
+            right_wins += 1
+            left_wins = 0
+        else:
+            values[k] = left[i]
+            i += 1
+            left_wins += 1
+            right_wins = 0
+        k += 1
+
+        if left_wins >= MIN_GALLOP and j < hi:
+            end = bisect_right(left, values[j], i)
+            values[k:k + end - i] = left[i:end]
+            k += end - i
+            i = end
+            left_wins = 0
+        elif right_wins >= MIN_GALLOP and i < len(left):
+            end = bisect_left(values, left[i], j, hi)
+            values[k:k + end - j] = values[j:end]
+            k += end - j
+            j = end
+            right_wins = 0
+
+    values[k:k + len(left) - i] = left[i:]
+    return values
+
+
+def merge_runs(values, runs):
+    """Merges adjacent pairs of sorted runs until one run is left"""
+    while len(runs) > 1:
+        merged = []
+        for i in range(0, len(runs) - 1, 2):
+            galloping_merge(values, runs[i][0], runs[i][1], runs[i + 1][1])
+            merged.append((runs[i][0], runs[i + 1][1]))
+        if len(runs) % 2 == 1:
+            merged.append(runs[-1])
+        runs = merged
+    return values
+
+
+def adaptive_sort(values, min_size_for_insertion=32, min_run=32, min_presortedness=0.5, key=None, reverse=False,
+                  stable=False, return_strategy=False):
+    """
+    Sorts values in place, choosing the strategy from the runs found in one scan of the values (see module docstring).
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param min_size_for_insertion: int, inputs up to this size are insertion sorted
+    :param min_run: int, minimum length of a run to count as existing order
+    :param min_presortedness: float, minimum fraction of values in long runs to merge runs instead of quick sorting
+    :param key: Function, if given values are sorted by key(value), keys are computed once per value
+    :param reverse: bool, sort in descending order
+    :param stable: bool, keep the original order of equal values, also in reverse, see key_sort.sort_by_key
+    :param return_strategy: bool, if True a tuple (values, strategy) is returned
+    :return: Iterable with sorted values, or (values, strategy) tuple
+    """
+    if key is not None or reverse or stable:
+        strategies = []
+
+        def sort_decorated(decorated):
+            decorated, strategy = adaptive_sort(decorated, min_size_for_insertion, min_run, min_presortedness,
+                                                return_strategy=True)
+            strategies.append(strategy)
+            return decorated
+
+        values = sort_by_key(sort_decorated, values, key, reverse, stable)
+        return (values, strategies[0]) if return_strategy else values
+
+    runs = find_runs(values)
+    if len(runs) <= 1:
+        strategy = 'sorted'
+    elif len(values) <= min_size_for_insertion:
+        strategy = 'insertion'
+        insertion_sort_range(values, 0, len(values))
+    elif presortedness(runs, len(values), min_run) >= min_presortedness:
+        strategy = 'merge'
+        merge_runs(values, collapse_short_runs(values, runs, min_run))
+    else:
+        strategy = 'quick'
+        introsort(values, 0, len(values) - 1)
+    return (values, strategy) if return_strategy else values
+
+
+if __name__ == '__main__':
+    import random
+
+    assert adaptive_sort([3, 4, 2, 7, 1], return_strategy=True) == ([1, 2, 3, 4, 7], 'insertion')
+    assert adaptive_sort([5, 4, 3, 2, 1], return_strategy=True) == ([1, 2, 3, 4, 5], 'sorted')
+    assert adaptive_sort(['bb', 'a', 'ccc', 'dd'], key=len, reverse=True, stable=True) == ['ccc', 'bb', 'dd', 'a']
+
+    appended = list(range(0, 20000, 2)) + [random.randint(0, 20000) for _ in range(300)]
+    assert adaptive_sort(list(appended), return_strategy=True) == (sorted(appended), 'merge')
+    runs = list(range(1000)) + list(range(500, 0, -1)) + list(range(250, 2000))
+    assert adaptive_sort(list(runs), return_strategy=True) == (sorted(runs), 'merge')
+    shuffled = [random.random() for _ in range(5000)]
+    assert adaptive_sort(list(shuffled), return_strategy=True) == (sorted(shuffled), 'quick')
@@ -1,18 +1,127 @@
+"""
+Bucket sort for numeric values. Values are distributed over buckets by their position in the range [min, max], so
+every bucket holds the values of one sub range and the buckets only have to be sorted internally and concatenated.
+
+The number of buckets is taken from a histogram of the values: the range is first divided in sqrt(n) equal width
+bins, and every bin gets as many buckets as it holds values. Dense parts of skewed data are spread over more
+buckets, so buckets stay small (about one value per bucket) and the sort runs in linear time on average.
+
+NumPy arrays are sorted without Python loops: the histogram is made by np.histogram, every value gets its bucket
+index in one vectorized expression and a stable argsort of the bucket indices places the values bucket after bucket.
+"""
+import math
+
 from src.sorting_algorithms.insertion_sort import insertion_sort
+from src.sorting_algorithms.quick_sort import quick_sort
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_SIZE_FOR_INSERTION = 32
+
+
+def number_of_bins(elements):
+    """Number of equal width histogram bins, sqrt(n)"""
+    return max(int(math.sqrt(len(elements))), 1)
 
 
-def number_of_buckets(elements):
-    return len(elements)
+def hash_double(element: float, n_buckets: int, minimum=0.0, maximum=1.0):
+    """
+    Integer bucket index of element when the range [minimum, maximum] is split into n_buckets equal width buckets.
+    The maximum value is put in the last bucket.
+    """
+    return min(int(n_buckets * (element - minimum) / (maximum - minimum)), n_buckets - 1)
 
 
-def hash_double(element: float, n_buckets: int):
-    return n_buckets * element
+class BucketLayout:
+    def __init__(self, bin_counts, minimum, maximum):
+        """
+        Maps values to bucket indices based on a histogram of the values.
+        Every histogram bin gets max(count, 1) buckets, bucket_offsets holds the index of the first bucket of every bin.
+
+        :param bin_counts: list, number of values in every equal width bin of [minimum, maximum]
+        :param minimum: lowest value
+        :param maximum: highest value
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.n_bins = len(bin_counts)
+        self.buckets_per_bin = [max(count, 1) for count in bin_counts]
+        self.bucket_offsets = []
+        n_buckets = 0
+        for buckets in self.buckets_per_bin:
+            self.bucket_offsets.append(n_buckets)
+            n_buckets += buckets
+        self.n_buckets = n_buckets
+
+    def bucket_index(self, element):
+        """Returns the index of the bucket element belongs to"""
+        position = self.n_bins * (element - self.minimum) / (self.maximum - self.minimum)
+        histogram_bin = min(int(position), self.n_bins - 1)
+        buckets = self.buckets_per_bin[histogram_bin]
+        return self.bucket_offsets[histogram_bin] + min(int((position - histogram_bin) * buckets), buckets - 1)
+
+
+def check_finite(elements):
+    """Raises a ValueError when elements contain inf or nan, which have no position in the range [min, max]"""
+    if np is not None and isinstance(elements, np.ndarray):
+        finite = bool(np.isfinite(elements).all())
+    else:
+        finite = all(isinstance(e, int) or math.isfinite(e) for e in elements)
+    if not finite:
+        raise ValueError("Bucket sort requires finite values, elements contain inf or nan")
+
+
+def create_layout(elements, minimum, maximum):
+    """Counts the elements in sqrt(n) equal width bins and returns the BucketLayout for that histogram"""
+    n_bins = number_of_bins(elements)
+    if np is not None and isinstance(elements, np.ndarray):
+        bin_counts, _ = np.histogram(elements, bins=n_bins, range=(minimum, maximum))
+        return BucketLayout(bin_counts.tolist(), minimum, maximum)
+    bin_counts = [0] * n_bins
+    for e in elements:
+        bin_counts[hash_double(e, n_bins, minimum, maximum)] += 1
+    return BucketLayout(bin_counts, minimum, maximum)
+
+
+def numpy_bucket_indices(elements, layout):
+    """Vectorized BucketLayout.bucket_index for a NumPy array of elements"""
+    position = layout.n_bins * (elements.astype(np.float64) - layout.minimum) / (layout.maximum - layout.minimum)
+    histogram_bins = np.minimum(position.astype(np.int64), layout.n_bins - 1)
+    buckets = np.asarray(layout.buckets_per_bin, dtype=np.int64)[histogram_bins]
+    offsets = np.asarray(layout.bucket_offsets, dtype=np.int64)[histogram_bins]
+    return offsets + np.minimum(((position - histogram_bins) * buckets).astype(np.int64), buckets - 1)
+
+
+def numpy_bucket_sort(elements, layout):
+    """
+    Sorts a NumPy array in place by the buckets of layout. A stable argsort of the bucket indices (a radix sort when
+    the indices fit in 16 bits) puts the values bucket after bucket. The values are then only out of order within
+    their (small) buckets, so the final stable sort, a timsort, only insertion sorts short runs and gallops over the
+    run boundaries, which are already in order, instead of merging them.
+    """
+    bucket_indices = numpy_bucket_indices(elements, layout)
+    if layout.n_buckets <= np.iinfo(np.uint16).max + 1:
+        bucket_indices = bucket_indices.astype(np.uint16)
+    elements[...] = elements[np.argsort(bucket_indices, kind='stable')]
+    elements.sort(kind='stable')
+    return elements
 
 
 def extract(buckets, elements):
+    """
+    Sorts every bucket and writes the buckets back into elements one after the other.
+    Small buckets are insertion sorted, buckets larger than MAX_SIZE_FOR_INSERTION (many duplicates or skew within
+    a histogram bin) are quick sorted.
+    """
     index = 0
-    for k in range(0, len(buckets.keys())):
-        sorted_bucket = insertion_sort(buckets[k])
+    for bucket in buckets:
+        if len(bucket) > MAX_SIZE_FOR_INSERTION:
+            sorted_bucket = quick_sort(bucket, min_size_for_insertion=16, introspective=True)
+        else:
+            sorted_bucket = insertion_sort(bucket)
         for e in sorted_bucket:
             elements[index] = e
             index += 1
@@ -20,14 +129,60 @@ def extract(buckets, elements):
 
 
 def bucket_sort(elements):
-    n_buckets = number_of_buckets(elements)
-    buckets = {k: [] for k in range(0, n_buckets)}
+    """
+    Sorts numeric elements (a list, array.array or NumPy array) in place with a bucket sort.
+
+    1. Find the minimum and maximum value
+    2. Create a histogram of the values and derive the buckets from it (see BucketLayout)
+    3. Put every value in its bucket (see numpy_bucket_sort for NumPy arrays)
+    4. Sort the buckets and concatenate them
+
+    :param elements: Iterable with finite numeric values
+    :return: Iterable with sorted values
+    :raises ValueError: when elements contain inf or nan
+    """
+    if len(elements) < 2:
+        return elements
 
+    check_finite(elements)
+    minimum = min(elements)
+    maximum = max(elements)
+    if minimum == maximum:
+        return elements
+
+    layout = create_layout(elements, minimum, maximum)
+    if np is not None and isinstance(elements, np.ndarray):
+        return numpy_bucket_sort(elements, layout)
+
+    buckets = [[] for _ in range(layout.n_buckets)]
     for e in elements:
-        bucket = hash_double(e, n_buckets)
-        buckets[bucket].append(e)
+        buckets[layout.bucket_index(e)].append(e)
     return extract(buckets, elements)
 
 
 if __name__ == '__main__':
-    print(bucket_sort([0.12, 0.5, 0.8, 0.9876]))
+    import random
+
+    assert bucket_sort([0.12, 0.5, 0.8, 0.9876]) == [0.12, 0.5, 0.8, 0.9876]
+    assert bucket_sort([3, -4, 2, 7, 1, 2]) == [-4, 1, 2, 2, 3, 7]
+    assert bucket_sort([5, 5, 5]) == [5, 5, 5]
+    assert bucket_sort([]) == []
+
+    uniform = [random.random() for _ in range(10_000)]
+    assert bucket_sort(list(uniform)) == sorted(uniform)
+    skewed = [random.expovariate(1.0) ** 4 for _ in range(10_000)]
+    assert bucket_sort(list(skewed)) == sorted(skewed)
+
+    for non_finite in ([1.0, float('inf'), 2.0], [float('nan'), 1.0, 2.0], [1.0, 2.0, float('-inf')]):
+        try:
+            bucket_sort(non_finite)
+            assert False, "non-finite values should be rejected"
+        except ValueError:
+            pass
+    assert bucket_sort([10 ** 30, 1, -5]) == [-5, 1, 10 ** 30]
+
+    if np is not None:
+        uniform_array = np.random.random(10_000)
+        assert np.array_equal(bucket_sort(uniform_array.copy()), np.sort(uniform_array))
+        int_array = np.random.randint(-100, 100, 10_000)
+        assert np.array_equal(bucket_sort(int_array.copy()), np.sort(int_array))
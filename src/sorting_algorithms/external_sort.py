@@ -0,0 +1,240 @@
+"""
+External merge sort for files that do not fit in memory.
+
+1. The input file is read in chunks that fit in the memory budget, every chunk is sorted with quick_sort and written
+   to a temporary file (a 'run')
+2. The runs are merged with a k-way merge: the first record of every run is stored in a heap (built with
+   heap_sort.build_heap) and the lowest record is repeatedly written to the output and replaced by the next record
+   of its run
+3. When there are more runs than the merge fan-in, groups of fan_in runs are merged into larger runs first
+
+Files are either newline-delimited (records are lines, compared as bytes) or binary with fixed width records
+described by a struct format (e.g. '<q' for little endian 64 bit integers).
+"""
+import io
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+from src.sorting_algorithms.heap_sort import build_heap, heapify
+from src.sorting_algorithms.quick_sort import quick_sort
+
+# Size of the pointer to a record in the list of a chunk
+LIST_POINTER_SIZE = 8
+
+
+class RunHead:
+    """
+    Current record of a run in the k-way merge heap. heapify builds a max heap using the gt function, so gt is
+    reversed: the head with the lowest record (ties broken by run index, which keeps the merge stable) ends up at
+    the root of the heap.
+    """
+    def __init__(self, record, run_index):
+        self.record = record
+        self.run_index = run_index
+
+    def __gt__(self, other):
+        return (self.record, self.run_index) < (other.record, other.run_index)
+
+
+class ExternalSorter:
+    def __init__(self, memory_budget=64 * 1024 ** 2, fan_in=64, record_format=None, temp_dir=None, use_mmap=False):
+        """
+
+        :param memory_budget: int, approximate number of bytes of memory used by the records of a sorted run, including
+            the overhead of the Python objects (a record of a few bytes takes tens of bytes in memory)
+        :param fan_in: int, maximum number of runs merged at once
+        :param record_format: str, struct format of fixed width binary records. If None, the file is newline-delimited
+        :param temp_dir: str, directory for the runs, defaults to the system temporary directory
+        :param use_mmap: bool, read binary runs through a memory map instead of buffered reads
+        """
+        if fan_in < 2:
+            raise ValueError("fan_in should be at least 2")
+        self.memory_budget = memory_budget
+        self.fan_in = fan_in
+        self.record_struct = struct.Struct(record_format) if record_format else None
+        self.temp_dir = temp_dir
+        self.use_mmap = use_mmap
+        self.buffer_size = max(memory_budget // (fan_in + 1), io.DEFAULT_BUFFER_SIZE)
+
+    @staticmethod
+    def record_footprint(record):
+        """Estimated number of bytes a record takes in a chunk: the record object(s) and its pointer in the list"""
+        size = sys.getsizeof(record) + LIST_POINTER_SIZE
+        if isinstance(record, tuple):
+            size += sum(sys.getsizeof(field) for field in record)
+        return size
+
+    def _read_chunks(self, file):
+        """
+        Yields lists of records read from file, the records of each list take about memory_budget bytes in memory.
+        Binary records all have the footprint of the first record (plus their packed size, for the buffer they are
+        unpacked from), the footprint of every line is counted separately.
+        """
+        if self.record_struct:
+            data = file.read(self.record_struct.size)
+            if not data:
+                return
+            footprint = self.record_footprint(self.record_struct.unpack(data)) + self.record_struct.size
+            records_per_chunk = max(self.memory_budget // footprint, 1)
+            data += file.read((records_per_chunk - 1) * self.record_struct.size)
+            while data:
+                yield list(self.record_struct.iter_unpack(data))
+                data = file.read(records_per_chunk * self.record_struct.size)
+        else:
+            chunk = []
+            chunk_size = 0
+            for line in file:
+                if not line.endswith(b'\n'):
+                    line += b'\n'
+                chunk.append(line)
+                chunk_size += self.record_footprint(line)
+                if chunk_size >= self.memory_budget:
+                    yield chunk
+                    chunk = []
+                    chunk_size = 0
+            if chunk:
+                yield chunk
+
+    def _write_records(self, file, records):
+        """Writes an iterable of records to an opened file"""
+        if self.record_struct:
+            pack = self.record_struct.pack
+            for record in records:
+                file.write(pack(*record))
+        else:
+            file.writelines(records)
+
+    def _read_records(self, path):
+        """Generator that streams the records of a run"""
+        with open(path, 'rb', buffering=self.buffer_size) as file:
+            if self.record_struct is None:
+                yield from file
+            elif self.use_mmap and os.path.getsize(path) > 0:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                    yield from self.record_struct.iter_unpack(mapped_file)
+            else:
+                read_size = max(self.buffer_size // self.record_struct.size, 1) * self.record_struct.size
+                while True:
+                    data = file.read(read_size)
+                    if not data:
+                        return
+                    yield from self.record_struct.iter_unpack(data)
+
+    def _new_run_path(self, run_dir):
+        file_descriptor, path = tempfile.mkstemp(dir=run_dir, suffix='.run')
+        os.close(file_descriptor)
+        return path
+
+    def create_runs(self, input_path, run_dir):
+        """
+        Splits the input file into sorted runs in run_dir
+
+        :return: list, paths of the runs
+        """
+        runs = []
+        with open(input_path, 'rb') as file:
+            for chunk in self._read_chunks(file):
+                chunk = quick_sort(chunk, min_size_for_insertion=16, introspective=True)
+                path = self._new_run_path(run_dir)
+                with open(path, 'wb', buffering=self.buffer_size) as run_file:
+                    self._write_records(run_file, chunk)
+                runs.append(path)
+        return runs
+
+    def merge_runs(self, runs, output_file):
+        """
+        K-way merges the sorted runs into output_file using a heap with the current record of every run.
+
+        :param runs: list, paths of sorted runs
+        :param output_file: opened binary file to write the merged records to
+        """
+        readers = [self._read_records(path) for path in runs]
+        heap = []
+        for run_index, reader in enumerate(readers):
+            record = next(reader, None)
+            if record is not None:
+                heap.append(RunHead(record, run_index))
+        heap = build_heap(heap)
+
+        write = self.record_struct.pack if self.record_struct else None
+        while len(heap) > 0:
+            head = heap[0]
+            output_file.write(write(*head.record) if write else head.record)
+            record = next(readers[head.run_index], None)
+            if record is not None:
+                head.record = record
+            else:
+                heap[0] = heap[-1]
+                heap.pop()
+            heap = heapify(heap, 0, len(heap))
+
+    def sort(self, input_path, output_path):
+        """
+        Sorts the records in input_path and writes them to output_path
+
+        :param input_path: str, path of the file to sort
+        :param output_path: str, path of the sorted output file
+        """
+        run_dir = tempfile.mkdtemp(dir=self.temp_dir, prefix='external_sort_')
+        try:
+            runs = self.create_runs(input_path, run_dir)
+            while len(runs) > self.fan_in:
+                merged_runs = []
+                for i in range(0, len(runs), self.fan_in):
+                    path = self._new_run_path(run_dir)
+                    with open(path, 'wb', buffering=self.buffer_size) as run_file:
+                        self.merge_runs(runs[i:i + self.fan_in], run_file)
+                    for run in runs[i:i + self.fan_in]:
+                        os.remove(run)
+                    merged_runs.append(path)
+                runs = merged_runs
+
+            with open(output_path, 'wb', buffering=self.buffer_size) as output_file:
+                self.merge_runs(runs, output_file)
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def external_sort(input_path, output_path, memory_budget=64 * 1024 ** 2, fan_in=64, record_format=None,
+                  temp_dir=None, use_mmap=False):
+    """
+    Sorts a file that may be larger than memory. See ExternalSorter for the parameters.
+    """
+    ExternalSorter(memory_budget, fan_in, record_format, temp_dir, use_mmap).sort(input_path, output_path)
+
+
+if __name__ == '__main__':
+    import random
+    import tracemalloc
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, 'input.txt')
+        output_file = os.path.join(directory, 'output.txt')
+        lines = [f"{random.randint(0, 10 ** 6)}\n".encode() for _ in range(5000)]
+        with open(input_file, 'wb') as file:
+            file.writelines(lines)
+        external_sort(input_file, output_file, memory_budget=2000, fan_in=4)
+        with open(output_file, 'rb') as file:
+            assert file.readlines() == sorted(lines)
+
+        numbers = [random.randint(-10 ** 9, 10 ** 9) for _ in range(5000)]
+        with open(input_file, 'wb') as file:
+            file.write(struct.pack(f'<{len(numbers)}q', *numbers))
+        for mapped in (False, True):
+            external_sort(input_file, output_file, memory_budget=4000, fan_in=3, record_format='<q',
+                          use_mmap=mapped)
+            with open(output_file, 'rb') as file:
+                assert list(struct.unpack(f'<{len(numbers)}q', file.read())) == sorted(numbers)
+
+        # A chunk should take about memory_budget bytes in memory, not memory_budget bytes of records on disk
+        sorter = ExternalSorter(memory_budget=100_000, record_format='<q')
+        with open(input_file, 'rb') as file:
+            tracemalloc.start()
+            chunk = next(sorter._read_chunks(file))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        assert peak < 1.5 * sorter.memory_budget and len(chunk) < 5000
@@ -1,4 +1,7 @@
-def heapify(values, current_index, max_index):
+from src.sorting_algorithms.key_sort import sort_by_key
+
+
+def heapify(values, current_index, max_index, offset=0):
     """
     Recursive function to heapify an iterable of values. Assumes the gt function is implemented for values in iterable.
 
@@ -7,28 +10,30 @@ def heapify(values, current_index, max_index):
     Child indices higher than the max_index are ignored.
     When the value at the child index is higher than the value at the current index, the values are swapped and the
     current function is called recursively to compare the next layer of children.
+    When an offset is given, the heap is stored in values[offset:offset + max_index], indices are relative to offset.
 
     :param values: Iterable with values that can be compared using gt function
     :param current_index: int, the index of the current value being looked at
     :param max_index: int, maximum index in the iterable of values to look at
+    :param offset: int, index in values where the heap starts, defaults to 0
     :return: Heapified iterable
     """
     left_child = 2 * current_index + 1
     right_child = 2 * current_index + 2
     largest_index = current_index
 
-    if left_child < max_index and values[left_child] > values[largest_index]:
+    if left_child < max_index and values[offset + left_child] > values[offset + largest_index]:
         largest_index = left_child
 
-    if right_child < max_index and values[right_child] > values[largest_index]:
+    if right_child < max_index and values[offset + right_child] > values[offset + largest_index]:
         largest_index = right_child
 
     if largest_index != current_index:
-        tmp = values[current_index]
-        values[current_index] = values[largest_index]
-        values[largest_index] = tmp
+        tmp = values[offset + current_index]
+        values[offset + current_index] = values[offset + largest_index]
+        values[offset + largest_index] = tmp
 
-        values = heapify(values, largest_index, max_index)
+        values = heapify(values, largest_index, max_index, offset)
 
     return values
 
@@ -47,7 +52,7 @@ def build_heap(values):
     return values
 
 
-def heap_sort(values):
+def heap_sort(values, key=None, reverse=False, stable=False):
     """
     Sort an iterable with values using a heap.
     The original values iterable is first heapified, then a loop is started that works its way back
@@ -57,8 +62,14 @@ def heap_sort(values):
     *Note that a subarray for index 0 has a length of one and so does not need to be heapified nor swapped.
 
     :param values: Iterable with values that can be compared using gt function
+    :param key: Function, if given values are sorted by key(value), keys are computed once per value
+    :param reverse: bool, sort in descending order
+    :param stable: bool, keep the original order of equal values, also in reverse, see key_sort.sort_by_key
     :return: Iterable with sorted values
     """
+    if key is not None or reverse or stable:
+        return sort_by_key(heap_sort, values, key, reverse, stable)
+
     values = build_heap(values)
     for i in range(len(values) - 1, 0, -1):
         tmp = values[0]
@@ -68,7 +79,30 @@ def heap_sort(values):
     return values
 
 
+def heap_sort_range(values, left, right):
+    """
+    Heap sorts the subarray values[left:right + 1] in place, leaving the values outside of the range untouched.
+    Used as fallback by introsort when a partition recurses too deep.
+
+    :param values: Iterable with values that can be compared using gt function
+    :param left: int, left bound index of (sub)array of values
+    :param right: int, right bound index of (sub)array of values (inclusive)
+    :return: Iterable with values, where values[left:right + 1] is sorted
+    """
+    n = right - left + 1
+    for i in range(n // 2 - 1, -1, -1):
+        values = heapify(values, i, n, left)
+    for i in range(n - 1, 0, -1):
+        tmp = values[left]
+        values[left] = values[left + i]
+        values[left + i] = tmp
+        values = heapify(values, 0, i, left)
+    return values
+
+
 if __name__ == '__main__':
     assert heap_sort([3, 4, 2, 7, 1]) == [1, 2, 3, 4, 7]
     assert heap_sort([3, 4, 2, 7, 1, 2]) == [1, 2, 2, 3, 4, 7]
     assert heap_sort([1, 2, 3, 4, 7]) == [1, 2, 3, 4, 7]
+    assert heap_sort_range([9, 3, 4, 2, 7, 1, 0], 1, 5) == [9, 1, 2, 3, 4, 7, 0]
+    assert heap_sort([3, 4, 2, 7, 1, 2], reverse=True) == [7, 4, 3, 2, 2, 1]
@@ -1,4 +1,7 @@
-def insertion_sort(values):
+from src.sorting_algorithms.key_sort import sort_by_key
+
+
+def insertion_sort(values, key=None, reverse=False, stable=False):
     """
     Sorts an Iterable of values by checking whether the previous value is higher than the current value. Requires
     a gt function to be implemented for values in the Iterable.
@@ -27,8 +30,14 @@ def insertion_sort(values):
     output round 2: [1, 2, 3]
 
     :param values: Iterable with values to be sorted. Expected to have a lt/gt functionality implemented
+    :param key: Function, if given values are sorted by key(value), keys are computed once per value
+    :param reverse: bool, sort in descending order
+    :param stable: bool, keep the original order of equal values, also in reverse, see key_sort.sort_by_key
     :return: Sorted Iterable with values
     """
+    if key is not None or reverse or stable:
+        return sort_by_key(insertion_sort, values, key, reverse, stable)
+
     for i in range(1, len(values)):
         j = i - 1
         current_value = values[i]
@@ -39,5 +48,28 @@ def insertion_sort(values):
     return values
 
 
+def insertion_sort_range(values, lo, hi):
+    """
+    In place variant of insertion_sort that only sorts the subarray values[lo:hi]. Values outside of the range are
+    left untouched, so no slices need to be copied when sorting small partitions of a larger iterable.
+
+    :param values: Iterable with values to be sorted. Expected to have a lt/gt functionality implemented
+    :param lo: int, first index of the range to sort (inclusive)
+    :param hi: int, last index of the range to sort (exclusive)
+    :return: Iterable with values, where values[lo:hi] is sorted
+    """
+    for i in range(lo + 1, hi):
+        j = i - 1
+        current_value = values[i]
+        while j >= lo and values[j] > current_value:
+            values[j + 1] = values[j]
+            j -= 1
+        values[j + 1] = current_value
+    return values
+
+
 if __name__ == '__main__':
     assert insertion_sort([3, 4, 2, 7, 1]) == [1, 2, 3, 4, 7]
+    assert insertion_sort_range([9, 3, 4, 2, 7, 1, 0], 1, 6) == [9, 1, 2, 3, 4, 7, 0]
+    assert insertion_sort_range([2, 1], 0, 0) == [2, 1]
+    assert insertion_sort(['bb', 'a', 'ccc'], key=len, reverse=True) == ['ccc', 'bb', 'a']
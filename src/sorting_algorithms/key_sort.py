@@ -0,0 +1,48 @@
+"""
+Key function support for the comparison sorts in this package.
+Keys are computed once per value, after which an index vector is sorted by key and applied to the values at the end.
+"""
+
+
+def sort_by_key(sort_function, values, key=None, reverse=False, stable=False):
+    """
+    Sorts values in place by key using sort_function.
+
+    Every value is decorated once as (key(value), index) and the decorated list is sorted by sort_function. The index
+    breaks ties between equal keys, so values themselves are never compared and the ascending order is always stable.
+    The sorted indices form the permutation that is applied to values at the end.
+    For reverse=True the sorted order is reversed. With stable=True the negated index is used as tie breaker, so
+    equal keys keep their original order after reversing (otherwise equal keys end up in reversed order).
+
+    :param sort_function: Function, sorts an iterable of (key, index) tuples and returns it
+    :param values: Iterable with values to sort
+    :param key: Function, computes the comparison key of a value, defaults to the value itself
+    :param reverse: bool, sort in descending order
+    :param stable: bool, keep the original order of values with equal keys when reverse is True
+    :return: Iterable with sorted values
+    """
+    negate_index = reverse and stable
+    if key is None:
+        decorated = [(value, -i if negate_index else i) for i, value in enumerate(values)]
+    else:
+        decorated = [(key(value), -i if negate_index else i) for i, value in enumerate(values)]
+
+    decorated = sort_function(decorated)
+    if reverse:
+        decorated.reverse()
+
+    original = list(values)
+    for position, (_, index) in enumerate(decorated):
+        values[position] = original[-index if negate_index else index]
+    return values
+
+
+if __name__ == '__main__':
+    def identity_sort(decorated):
+        decorated.sort()
+        return decorated
+
+    assert sort_by_key(identity_sort, ['bb', 'a', 'cc', 'd'], key=len) == ['a', 'd', 'bb', 'cc']
+    assert sort_by_key(identity_sort, ['bb', 'a', 'cc', 'd'], key=len, reverse=True) == ['cc', 'bb', 'd', 'a']
+    assert sort_by_key(identity_sort, ['bb', 'a', 'cc', 'd'], key=len, reverse=True, stable=True) == \
+        ['bb', 'cc', 'a', 'd']
@@ -0,0 +1,56 @@
+"""
+Helpers for numeric values stored in lists, array.array objects and NumPy arrays, shared by the sorts that work on
+numbers instead of comparisons (radix sort, bucket sort) and by the shared memory path of the parallel sort.
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMERIC_TYPECODES = 'bBhHiIlLqQfd'
+
+
+def numeric_typecode(values):
+    """
+    Returns the array typecode values can be stored in, or None when values are not (all) numeric.
+    Lists are stored as 64 bit integers ('q') or doubles ('d').
+    """
+    if isinstance(values, array):
+        return values.typecode if values.typecode in NUMERIC_TYPECODES else None
+    if all(type(value) is int for value in values):
+        try:
+            array('q', values)
+        except OverflowError:
+            return None
+        return 'q'
+    if all(type(value) is float for value in values):
+        return 'd'
+    return None
+
+
+def as_numpy(values, typecode):
+    """
+    NumPy array with the values of a list or array.array, typecode as returned by numeric_typecode (array typecodes are
+    valid NumPy dtype codes). An array.array is wrapped without a copy, so changing the NumPy array in place changes
+    values. Requires NumPy.
+    """
+    if isinstance(values, array):
+        return np.frombuffer(values, dtype=typecode)
+    return np.array(values, dtype=typecode)
+
+
+if __name__ == '__main__':
+    assert numeric_typecode([1, -2, 3]) == 'q'
+    assert numeric_typecode([1.5, 2.0]) == 'd'
+    assert numeric_typecode(array('f', [1.0])) == 'f'
+    assert numeric_typecode([1, 2.0]) is None
+    assert numeric_typecode([2 ** 64]) is None
+    assert numeric_typecode(['a']) is None
+
+    if np is not None:
+        shared = array('i', [3, 1, 2])
+        as_numpy(shared, 'i').sort()
+        assert shared == array('i', [1, 2, 3])
+        assert as_numpy([1.5, 0.5], 'd').tolist() == [1.5, 0.5]
@@ -0,0 +1,204 @@
+"""
+Parallel sample sort: the values are divided into buckets by splitters sampled from the input, every bucket is
+sorted by quick_sort in a separate process and the sorted buckets are concatenated.
+Numeric data is passed to the workers through a shared memory buffer, so the buckets don't have to be pickled.
+"""
+import os
+import random
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from src.sorting_algorithms.numeric_arrays import numeric_typecode
+from src.sorting_algorithms.quick_sort import quick_sort
+
+
+def select_splitters(values, n_buckets, oversampling=32):
+    """
+    Selects n_buckets - 1 splitters from a random sample of values. The sample (of size n_buckets * oversampling) is
+    sorted and every oversampling-th value is picked, so the buckets get roughly the same number of values.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param n_buckets: int, number of buckets to split the values in
+    :param oversampling: int, number of samples taken per bucket
+    :return: list, sorted splitters
+    """
+    sample_size = min(len(values), n_buckets * oversampling)
+    sample = quick_sort([values[i] for i in random.sample(range(len(values)), sample_size)], introspective=True)
+    step = len(sample) / n_buckets
+    return [sample[int(step * i)] for i in range(1, n_buckets)]
+
+
+def split_into_buckets(values, splitters):
+    """
+    Puts every value in the bucket between the two splitters it falls between (found by binary search).
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param splitters: list, sorted splitters
+    :return: list of lists, len(splitters) + 1 buckets
+    """
+    buckets = [[] for _ in range(len(splitters) + 1)]
+    for value in values:
+        buckets[bisect_right(splitters, value)].append(value)
+    return buckets
+
+
+def _group_shared_chunk(shared_memory_name, typecode, start, end, splitters):
+    """
+    Worker function: reorders the values stored in a shared memory buffer between start and end (exclusive) in place,
+    so the values of every bucket are next to each other in bucket order.
+
+    :return: list, number of values of the chunk per bucket
+    """
+    shared_memory = SharedMemory(name=shared_memory_name)
+    view = shared_memory.buf.cast(typecode)
+    try:
+        buckets = split_into_buckets(view[start:end].tolist(), splitters)
+        for bucket in buckets:
+            view[start:start + len(bucket)] = array(typecode, bucket)
+            start += len(bucket)
+        return [len(bucket) for bucket in buckets]
+    finally:
+        view.release()
+        shared_memory.close()
+
+
+def _sort_shared_bucket(input_name, output_name, typecode, segments, output_start, min_size_for_insertion):
+    """
+    Worker function: gathers the values of one bucket from its segments ((start, end) ranges of the grouped chunks in
+    the shared input buffer), sorts them and writes them to the shared output buffer from output_start on.
+    """
+    input_memory = SharedMemory(name=input_name)
+    output_memory = SharedMemory(name=output_name)
+    input_view = input_memory.buf.cast(typecode)
+    output_view = output_memory.buf.cast(typecode)
+    try:
+        bucket = []
+        for start, end in segments:
+            bucket.extend(input_view[start:end].tolist())
+        quick_sort(bucket, min_size_for_insertion, introspective=True)
+        output_view[output_start:output_start + len(bucket)] = array(typecode, bucket)
+    finally:
+        input_view.release()
+        output_view.release()
+        input_memory.close()
+        output_memory.close()
+
+
+def _sort_bucket(bucket, min_size_for_insertion):
+    """Worker function: sorts a (pickled) bucket and returns it"""
+    return quick_sort(bucket, min_size_for_insertion, introspective=True)
+
+
+def _parallel_sort_shared(executor, values, typecode, splitters, workers, min_size_for_insertion):
+    """
+    Sorts numeric values through two shared memory buffers of the size of values. The parent only copies values into
+    the input buffer and the result back out of the output buffer, the bucketing and gathering happen in the workers:
+
+    1. Every worker groups a chunk of the input buffer by bucket in place and returns its counts per bucket
+    2. Every worker gathers the segments of one bucket from all chunks, sorts them and writes them to the output buffer
+       at the offset of the bucket (the sum of the counts of all lower buckets)
+    """
+    n_bytes = len(values) * array(typecode).itemsize
+    input_memory = SharedMemory(create=True, size=max(n_bytes, 1))
+    output_memory = SharedMemory(create=True, size=max(n_bytes, 1))
+    try:
+        if isinstance(values, array):
+            with memoryview(values) as values_view:
+                input_memory.buf[:n_bytes] = values_view.cast('B')
+        else:
+            input_memory.buf[:n_bytes] = array(typecode, values).tobytes()
+
+        chunk_size = -(-len(values) // workers)
+        chunk_starts = range(0, len(values), chunk_size)
+        futures = [executor.submit(_group_shared_chunk, input_memory.name, typecode, start,
+                                   min(start + chunk_size, len(values)), splitters) for start in chunk_starts]
+        chunk_counts = [future.result() for future in futures]
+
+        futures = []
+        output_start = 0
+        for bucket in range(len(splitters) + 1):
+            segments = []
+            for chunk_start, counts in zip(chunk_starts, chunk_counts):
+                segment_start = chunk_start + sum(counts[:bucket])
+                segments.append((segment_start, segment_start + counts[bucket]))
+            bucket_size = sum(counts[bucket] for counts in chunk_counts)
+            if bucket_size > 0:
+                futures.append(executor.submit(_sort_shared_bucket, input_memory.name, output_memory.name, typecode,
+                                               segments, output_start, min_size_for_insertion))
+            output_start += bucket_size
+        for future in futures:
+            future.result()
+
+        if isinstance(values, array):
+            with memoryview(values) as values_view:
+                values_view.cast('B')[:] = output_memory.buf[:n_bytes]
+        else:
+            with output_memory.buf[:n_bytes].cast(typecode) as output_view:
+                values[:] = output_view.tolist()
+    finally:
+        for shared_memory in (input_memory, output_memory):
+            shared_memory.close()
+            shared_memory.unlink()
+    return values
+
+
+def parallel_sort(values, workers=None, min_size_for_insertion=16, min_size_for_parallel=100_000):
+    """
+    Sorts values in place using a process pool.
+
+    1. Select workers - 1 splitters from a random sample of the values
+    2. Divide the values over the buckets between the splitters
+    3. Sort every bucket with quick_sort in a separate process
+    4. Write the sorted buckets back into values one after the other
+
+    For numeric values (array.array or lists of only ints or only floats) the values are copied to a shared memory
+    buffer once, and the workers divide them over the buckets and sort the buckets (see _parallel_sort_shared). Other
+    values are divided over the buckets in the current process and pickled to the workers.
+    Inputs smaller than min_size_for_parallel are sorted with quick_sort in the current process.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param workers: int, number of processes, defaults to os.cpu_count()
+    :param min_size_for_insertion: int, passed on to quick_sort
+    :param min_size_for_parallel: int, inputs smaller than this are not sorted in parallel
+    :return: Iterable with sorted values
+    """
+    workers = workers if workers else os.cpu_count()
+    if workers <= 1 or len(values) < max(min_size_for_parallel, 2):
+        return quick_sort(values, min_size_for_insertion, introspective=True)
+
+    splitters = select_splitters(values, workers)
+    typecode = numeric_typecode(values)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if typecode is not None:
+            return _parallel_sort_shared(executor, values, typecode, splitters, workers, min_size_for_insertion)
+
+        futures = [executor.submit(_sort_bucket, bucket, min_size_for_insertion)
+                   for bucket in split_into_buckets(values, splitters)]
+        index = 0
+        for future in futures:
+            for value in future.result():
+                values[index] = value
+                index += 1
+    return values
+
+
+if __name__ == '__main__':
+    assert parallel_sort([3, 4, 2, 7, 1]) == [1, 2, 3, 4, 7]
+
+    random_ints = [random.randint(-1000, 1000) for _ in range(20_000)]
+    assert parallel_sort(list(random_ints), workers=4, min_size_for_parallel=1000) == sorted(random_ints)
+
+    random_floats = array('d', [random.random() for _ in range(20_000)])
+    assert parallel_sort(array('d', random_floats), workers=4, min_size_for_parallel=1000) == \
+        array('d', sorted(random_floats))
+
+    random_words = [str(random.random()) for _ in range(5000)]
+    assert parallel_sort(list(random_words), workers=3, min_size_for_parallel=1000) == sorted(random_words)
+
+    # Many duplicates leave some buckets empty
+    duplicates = array('i', [random.randint(0, 3) for _ in range(20_000)])
+    assert parallel_sort(array('i', duplicates), workers=4, min_size_for_parallel=1000) == \
+        array('i', sorted(duplicates))
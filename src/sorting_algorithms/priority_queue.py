@@ -0,0 +1,155 @@
+"""
+Indexed binary min heap priority queue.
+Uses the same array layout as heap_sort (children of index i at 2 * i + 1 and 2 * i + 2), but sifts iteratively and
+keeps the position of every item in the heap, so the priority of an item can be changed in O(log n).
+"""
+
+
+class PriorityQueue:
+    def __init__(self, items=None):
+        """
+
+        :param items: Iterable with (item, priority) tuples to initialize the queue with. Items should be hashable and
+            unique, priorities should have the lt function implemented
+        """
+        self.heap = []
+        self.positions = {}
+        if items:
+            for item, priority in items:
+                if item in self.positions:
+                    raise ValueError(f"Item {item} is already in the priority queue")
+                self.positions[item] = len(self.heap)
+                self.heap.append([priority, item])
+            for i in range(len(self.heap) // 2 - 1, -1, -1):
+                self._sift_down(i)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def _swap(self, index_one, index_two):
+        """Switches the entries at index_one and index_two and updates their positions"""
+        self.heap[index_one], self.heap[index_two] = self.heap[index_two], self.heap[index_one]
+        self.positions[self.heap[index_one][1]] = index_one
+        self.positions[self.heap[index_two][1]] = index_two
+
+    def _sift_up(self, index):
+        """Moves the entry at index up while its priority is lower than the priority of its parent"""
+        while index > 0:
+            parent = (index - 1) // 2
+            if not self.heap[index][0] < self.heap[parent][0]:
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index):
+        """Moves the entry at index down while one of its children has a lower priority"""
+        size = len(self.heap)
+        while True:
+            left_child = 2 * index + 1
+            right_child = 2 * index + 2
+            lowest_index = index
+            if left_child < size and self.heap[left_child][0] < self.heap[lowest_index][0]:
+                lowest_index = left_child
+            if right_child < size and self.heap[right_child][0] < self.heap[lowest_index][0]:
+                lowest_index = right_child
+            if lowest_index == index:
+                break
+            self._swap(index, lowest_index)
+            index = lowest_index
+
+    def push(self, item, priority):
+        """Adds item with the given priority, raises a ValueError when the item is already in the queue"""
+        if item in self.positions:
+            raise ValueError(f"Item {item} is already in the priority queue, use update to change its priority")
+        self.positions[item] = len(self.heap)
+        self.heap.append([priority, item])
+        self._sift_up(len(self.heap) - 1)
+
+    def peek(self):
+        """Returns the (item, priority) with the lowest priority without removing it"""
+        if len(self.heap) == 0:
+            raise IndexError("peek from an empty priority queue")
+        priority, item = self.heap[0]
+        return item, priority
+
+    def pop(self):
+        """Removes and returns the (item, priority) with the lowest priority"""
+        if len(self.heap) == 0:
+            raise IndexError("pop from an empty priority queue")
+        self._swap(0, len(self.heap) - 1)
+        priority, item = self.heap.pop()
+        del self.positions[item]
+        if len(self.heap) > 0:
+            self._sift_down(0)
+        return item, priority
+
+    def get_priority(self, item):
+        """Returns the current priority of item"""
+        return self.heap[self.positions[item]][0]
+
+    def update(self, item, priority):
+        """Changes the priority of item (higher or lower) and restores the heap"""
+        index = self.positions[item]
+        old_priority = self.heap[index][0]
+        self.heap[index][0] = priority
+        if priority < old_priority:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def decrease_key(self, item, priority):
+        """Lowers the priority of item, raises a ValueError if priority is higher than the current priority"""
+        if self.get_priority(item) < priority:
+            raise ValueError(f"New priority {priority} is higher than the current priority of {item}")
+        self.update(item, priority)
+
+
+def top_k(stream, k, key=None):
+    """
+    Returns the k largest items of an (unbounded) iterable, using O(k) memory.
+    The k largest items seen so far are kept in a PriorityQueue, with the smallest of them at the root. Every new item
+    that is larger than the root replaces the root. Of equal items the earliest are kept.
+
+    :param stream: Iterable with items, or the keys of items should have the lt function implemented
+    :param k: int, number of items to return
+    :param key: Function, computes the value items are compared by, defaults to the item itself
+    :return: list, the k largest items, largest first
+    """
+    if k <= 0:
+        return []
+    queue = PriorityQueue()
+    items = {}
+    for handle, item in enumerate(stream):
+        item_key = key(item) if key else item
+        if len(queue) < k:
+            queue.push(handle, (item_key, -handle))
+            items[handle] = item
+        elif queue.peek()[1][0] < item_key:
+            removed, _ = queue.pop()
+            del items[removed]
+            queue.push(handle, (item_key, -handle))
+            items[handle] = item
+
+    result = []
+    while len(queue) > 0:
+        handle, _ = queue.pop()
+        result.append(items[handle])
+    result.reverse()
+    return result
+
+
+if __name__ == '__main__':
+    queue = PriorityQueue([('a', 5), ('b', 3), ('c', 8)])
+    queue.push('d', 1)
+    assert queue.peek() == ('d', 1)
+    queue.decrease_key('c', 0)
+    queue.update('d', 10)
+    assert [queue.pop() for _ in range(len(queue))] == [('c', 0), ('b', 3), ('a', 5), ('d', 10)]
+
+    assert top_k(iter([5, 1, 9, 3, 7, 9]), 3) == [9, 9, 7]
+    assert top_k(['bb', 'a', 'ccc', 'dd'], 2, key=len) == ['ccc', 'bb']
+    assert top_k(range(10 ** 5), 3) == [99999, 99998, 99997]
+    assert top_k([1, 2], 5) == [2, 1]
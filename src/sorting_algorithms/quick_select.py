@@ -0,0 +1,199 @@
+"""
+Selection of the k-th smallest value without fully sorting, based on the partition functions of quick_sort.
+Every round partitions the range around a pivot and continues only in the part that holds rank k, which takes O(n)
+on average. The partition rounds may scan WORK_BUDGET * n values in total: once that budget is spent (bad pivots), the
+median of medians is used as pivot, which guarantees linear time in the worst case.
+"""
+import math
+
+from src.sorting_algorithms.insertion_sort import insertion_sort_range
+from src.sorting_algorithms.quick_sort import introsort, ninther_index, three_way_partition
+
+# Values the ninther partition rounds may scan per value of the range before the median of medians takes over. Good
+# pivots halve the range every round and scan about 2 * n values in total
+WORK_BUDGET = 6
+
+
+def median_of_medians_index(values, left, right):
+    """
+    Finds a pivot index that is guaranteed to have at least ~30% of the values on either side.
+    The range is split in groups of 5 values, every group is insertion sorted and its median is moved to the front of
+    the range. The median of these medians is then selected with nth_element.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param left: int, left bound index of (sub)array of values
+    :param right: int, right bound index of (sub)array of values
+    :return: int, pivot index
+    """
+    n_medians = 0
+    for group_start in range(left, right + 1, 5):
+        group_end = min(group_start + 5, right + 1)
+        insertion_sort_range(values, group_start, group_end)
+        median_index = (group_start + group_end - 1) // 2
+        values[left + n_medians], values[median_index] = values[median_index], values[left + n_medians]
+        n_medians += 1
+
+    middle_index = left + (n_medians - 1) // 2
+    nth_element(values, middle_index, left, left + n_medians - 1)
+    return middle_index
+
+
+def nth_element(values, k, left=0, right=None):
+    """
+    Rearranges values[left:right + 1] in place so values[k] holds the value it would have when the range is sorted,
+    all values before it are lower than or equal to it and all values after it are greater than or equal to it.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param k: int, index (rank) to select, left <= k <= right
+    :param left: int, left bound index of (sub)array of values, defaults to 0
+    :param right: int, right bound index of (sub)array of values, defaults to len(values) - 1
+    :return: Iterable with values, partitioned around index k
+    """
+    right = len(values) - 1 if right is None else right
+    if not left <= k <= right:
+        raise IndexError(f"Rank {k} is outside of the range [{left}, {right}]")
+
+    budget = WORK_BUDGET * (right - left + 1)
+    while right > left:
+        if budget > 0:
+            pivot_index = ninther_index(values, left, right)
+            budget -= right - left + 1
+        else:
+            pivot_index = median_of_medians_index(values, left, right)
+
+        lower_index, upper_index = three_way_partition(values, left, right, pivot_index)
+        if k < lower_index:
+            right = lower_index - 1
+        elif k > upper_index:
+            left = upper_index + 1
+        else:
+            break
+    return values
+
+
+def select(values, k):
+    """
+    Returns the k-th smallest value (k = 0 for the minimum) of values. Values are reordered in place.
+    """
+    return nth_element(values, k)[k]
+
+
+def partial_sort(values, k):
+    """
+    Rearranges values in place so values[:k] holds the k smallest values in sorted order, the order of the remaining
+    values is undefined.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param k: int, number of smallest values to sort
+    :return: Iterable with values, of which the first k are sorted
+    """
+    k = min(k, len(values))
+    if k <= 0:
+        return values
+    values = nth_element(values, k - 1)
+    return introsort(values, 0, k - 1)
+
+
+def multi_select(values, ranks):
+    """
+    Places the values of several ranks in place, as nth_element would do for every rank separately.
+    The middle rank is selected first, which partitions the range: lower ranks only have to be searched on its left
+    side and higher ranks on its right side, so partitions are reused between ranks.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param ranks: Iterable with int ranks
+    :return: Iterable with values, with the values for all ranks in place
+    """
+    stack = [(0, len(values) - 1, sorted(set(ranks)))]
+    while len(stack) > 0:
+        left, right, range_ranks = stack.pop()
+        if len(range_ranks) == 0:
+            continue
+        middle = len(range_ranks) // 2
+        k = range_ranks[middle]
+        nth_element(values, k, left, right)
+        stack.append((left, k - 1, range_ranks[:middle]))
+        stack.append((k + 1, right, range_ranks[middle + 1:]))
+    return values
+
+
+def percentile_rank(n, percentile):
+    """Index of the given percentile in a sorted collection of n values (nearest rank method)"""
+    if not 0 <= percentile <= 100:
+        raise ValueError(f"Percentile should be between 0 and 100, got {percentile}")
+    return max(math.ceil(percentile / 100 * n) - 1, 0)
+
+
+def percentiles(values, percentile_list):
+    """
+    Computes several percentiles at once with multi_select. Values are reordered in place.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param percentile_list: Iterable with percentiles between 0 and 100, e.g. [50, 95, 99]
+    :return: list, values at the given percentiles, in the order of percentile_list
+    """
+    if len(values) == 0:
+        raise ValueError("Cannot compute percentiles of an empty collection")
+    ranks = [percentile_rank(len(values), percentile) for percentile in percentile_list]
+    values = multi_select(values, ranks)
+    return [values[rank] for rank in ranks]
+
+
+if __name__ == '__main__':
+    import random
+
+    assert select([3, 4, 2, 7, 1], 0) == 1
+    assert select([3, 4, 2, 7, 1], 2) == 3
+    assert partial_sort([3, 4, 2, 7, 1, 2], 3)[:3] == [1, 2, 2]
+    assert percentiles(list(range(1, 101)), [50, 95, 99, 100]) == [50, 95, 99, 100]
+
+    random_values = [random.randint(0, 1000) for _ in range(5000)]
+    ordered = sorted(random_values)
+    assert percentiles(list(random_values), [0, 50, 99]) == [ordered[0], ordered[2499], ordered[4949]]
+    for rank in (0, 17, 2500, 4999):
+        assert select(list(random_values), rank) == ordered[rank]
+
+    assert select(list(range(100000)), 50000) == 50000
+    assert select(list(range(100000, 0, -1)), 99) == 100
+
+    class AdversaryValue:
+        """
+        McIlroy's quicksort adversary: all values start as gas, higher than every solid value. When two gas values are
+        compared, the one that is likely the pivot is frozen to the next solid value, so every pivot picked from the
+        gas ends up near the bottom of the range. Without the median of medians fallback this forces O(n^2)
+        comparisons.
+        """
+        def __init__(self, state, index):
+            self.state = state
+            self.index = index
+
+        def compare(self, other):
+            solids = self.state['solids']
+            gas = len(solids)
+            self.state['comparisons'] += 1
+            if solids[self.index] == gas and solids[other.index] == gas:
+                frozen = self.index if self.index == self.state['candidate'] else other.index
+                solids[frozen] = self.state['n_solid']
+                self.state['n_solid'] += 1
+            if solids[self.index] == gas:
+                self.state['candidate'] = self.index
+            elif solids[other.index] == gas:
+                self.state['candidate'] = other.index
+            return solids[self.index] - solids[other.index]
+
+        def __lt__(self, other):
+            return self.compare(other) < 0
+
+        def __gt__(self, other):
+            return self.compare(other) > 0
+
+        def __le__(self, other):
+            return self.compare(other) <= 0
+
+    # The worst case guarantee: a linear number of comparisons, also against the adversary
+    for n in (2000, 20000):
+        state = {'solids': [n] * n, 'n_solid': 0, 'candidate': None, 'comparisons': 0}
+        adversary_values = nth_element([AdversaryValue(state, index) for index in range(n)], n // 2)
+        ranks = [state['solids'][value.index] for value in adversary_values]
+        assert max(ranks[:n // 2]) <= ranks[n // 2] <= min(ranks[n // 2 + 1:])
+        assert state['comparisons'] <= 30 * n
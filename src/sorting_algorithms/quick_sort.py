@@ -2,7 +2,13 @@
 Code adapted to Python from:
 https://github.com/heineman/algorithms-nutshell-2ed/blob/master/JavaCode/src/algs/model/array/Selection.java
 """
-from src.sorting_algorithms.insertion_sort import insertion_sort
+import math
+
+from src.sorting_algorithms.heap_sort import heap_sort_range
+from src.sorting_algorithms.insertion_sort import insertion_sort_range
+from src.sorting_algorithms.key_sort import sort_by_key
+
+NINTHER_THRESHOLD = 40
 
 
 def switch_values_at_indices(values, index_one, index_two):
@@ -42,6 +48,36 @@ def partition(values, left, right, pivot_index):
     return values, store_index
 
 
+def three_way_partition(values, left, right, pivot_index):
+    """
+    Partition an iterable values into three parts by the value stored at pivot_index: values lower than the pivot
+    value, values equal to the pivot value and values greater than the pivot value (Dutch national flag partitioning).
+    All values equal to the pivot end up next to each other, so they don't have to be looked at again, which keeps
+    inputs with many duplicates from degrading to O(n^2).
+
+    :param values: Iterable with values that have gt/lt functions implemented
+    :param left: int, lowest index to look at
+    :param right: int, highest index to look at
+    :param pivot_index: int, index of the pivot value
+    :return: Tuple, (lower_index, upper_index) the range values[lower_index:upper_index + 1] that holds the pivot value
+    """
+    pivot_value = values[pivot_index]
+    lower_index = left
+    i = left
+    upper_index = right
+    while i <= upper_index:
+        if values[i] < pivot_value:
+            values = switch_values_at_indices(values, i, lower_index)
+            lower_index += 1
+            i += 1
+        elif values[i] > pivot_value:
+            values = switch_values_at_indices(values, i, upper_index)
+            upper_index -= 1
+        else:
+            i += 1
+    return lower_index, upper_index
+
+
 def select_pivot_index(values, left, right):
     """
     Selects a pivot index. Takes indices left (min), middle, right (max) and first compares the values at
@@ -69,6 +105,39 @@ def select_pivot_index(values, left, right):
     return pivot_index
 
 
+def median_of_three_index(values, first_index, second_index, third_index):
+    """Returns the index (of the three given indices) of the median of the three values"""
+    if values[first_index] < values[second_index]:
+        if values[second_index] < values[third_index]:
+            return second_index
+        return third_index if values[first_index] < values[third_index] else first_index
+    if values[first_index] < values[third_index]:
+        return first_index
+    return third_index if values[second_index] < values[third_index] else second_index
+
+
+def ninther_index(values, left, right):
+    """
+    Selects a pivot index for introsort. Small ranges use the median of the first, middle and last value. Ranges of
+    more than NINTHER_THRESHOLD values use Tukey's ninther, the median of the medians of three groups of three values
+    spread over the range, which is a much better estimate of the median and doesn't degrade on sorted, reversed or
+    organ-pipe input.
+
+    :param values: Iterable with values, gt/lt function should be implemented for values
+    :param left: int, left bound index of (sub)array of values
+    :param right: int, right bound index of (sub)array of values
+    :return: int, chosen pivot index
+    """
+    middle = (left + right) // 2
+    if right - left + 1 <= NINTHER_THRESHOLD:
+        return median_of_three_index(values, left, middle, right)
+    step = (right - left + 1) // 8
+    return median_of_three_index(values,
+                                 median_of_three_index(values, left, left + step, left + 2 * step),
+                                 median_of_three_index(values, middle - step, middle, middle + step),
+                                 median_of_three_index(values, right - 2 * step, right - step, right))
+
+
 def recursive_quick_sort(values, left, right, min_size_for_insertion=0):
     """
     Gets a pivot index, partitions the iterable values and either quick sorts or insertion sorts the partitions
@@ -88,26 +157,85 @@ def recursive_quick_sort(values, left, right, min_size_for_insertion=0):
     values, pivot_index = partition(values, left, right, pivot_index)
 
     if pivot_index - 1 - left <= min_size_for_insertion:
-        values[left: pivot_index] = insertion_sort(values[left:pivot_index])
+        values = insertion_sort_range(values, left, pivot_index)
     else:
         values = recursive_quick_sort(values, left, pivot_index - 1, min_size_for_insertion)
 
     if right - pivot_index - 1 <= min_size_for_insertion:
-        values[pivot_index + 1: right + 1] = insertion_sort(values[pivot_index + 1: right + 1])
+        values = insertion_sort_range(values, pivot_index + 1, right + 1)
     else:
         values = recursive_quick_sort(values, pivot_index + 1, right, min_size_for_insertion)
 
     return values
 
 
-def quick_sort(values, min_size_for_insertion=0):
+def introsort(values, left, right, min_size_for_insertion=16, fallback_ranges=None):
+    """
+    Iterative introspective sort of values[left:right + 1] in place.
+    Uses an explicit stack instead of recursion: the larger partition is pushed on the stack and the loop continues
+    with the smaller partition, so the stack never holds more than O(log n) ranges.
+    Pivots are chosen by ninther_index and partitions are three-way partitioned, so duplicates of the pivot value are
+    excluded from further sorting.
+    Every range gets a depth budget of 2 * log2(n) partition rounds. When a range runs out of budget (e.g. on
+    median-of-three killer input), it is heap sorted instead, which guarantees O(n log n) in the worst case.
+    Ranges with at most min_size_for_insertion values are insertion sorted in place.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values
+    :param left: int, left bound index of (sub)array of values
+    :param right: int, right bound index of (sub)array of values
+    :param min_size_for_insertion: int, ranges up to this size are insertion sorted, defaults to 16
+    :param fallback_ranges: list, if given the (left, right) ranges that ran out of depth budget and were heap sorted
+        are appended to it
+    :return: Iterable with sorted values
+    """
+    if right <= left:
+        return values
+
+    depth_limit = 2 * int(math.log2(right - left + 1))
+    stack = [(left, right, depth_limit)]
+    while len(stack) > 0:
+        left, right, depth = stack.pop()
+        while right - left + 1 > min_size_for_insertion and right > left:
+            if depth == 0:
+                if fallback_ranges is not None:
+                    fallback_ranges.append((left, right))
+                values = heap_sort_range(values, left, right)
+                break
+            depth -= 1
+
+            pivot_index = ninther_index(values, left, right)
+            lower_index, upper_index = three_way_partition(values, left, right, pivot_index)
+
+            if lower_index - left < right - upper_index:
+                stack.append((upper_index + 1, right, depth))
+                right = lower_index - 1
+            else:
+                stack.append((left, lower_index - 1, depth))
+                left = upper_index + 1
+        else:
+            values = insertion_sort_range(values, left, right + 1)
+    return values
+
+
+def quick_sort(values, min_size_for_insertion=0, introspective=False, key=None, reverse=False, stable=False):
     """
     Calls the recursive quick sort function, returns sorted values
     :param values: Iterable with values, should have gt/lt functions implemented for values
     :param min_size_for_insertion: int, If set to higher than 0, insertion sort will be used for partitions smaller than
         the size specified, to speed up the algorithm
+    :param introspective: bool, if True the iterative introsort is used instead of the recursive quick sort, which
+        is safe for large and adversarial inputs (no recursion limit, O(n log n) worst case)
+    :param key: Function, if given values are sorted by key(value), keys are computed once per value
+    :param reverse: bool, sort in descending order
+    :param stable: bool, keep the original order of equal values, also in reverse, see key_sort.sort_by_key
     :return: Iterable with sorted values
     """
+    if key is not None or reverse or stable:
+        return sort_by_key(lambda decorated: quick_sort(decorated, min_size_for_insertion, introspective),
+                           values, key, reverse, stable)
+
+    if introspective:
+        return introsort(values, 0, len(values) - 1, min_size_for_insertion)
     return recursive_quick_sort(values, 0, len(values) - 1, min_size_for_insertion)
 
 
@@ -119,3 +247,20 @@ if __name__ == '__main__':
     assert quick_sort([3, 4, 2, 7, 1], min_size_for_insertion=2) == [1, 2, 3, 4, 7]
     assert quick_sort([3, 4, 2, 7, 1, 2], min_size_for_insertion=2) == [1, 2, 2, 3, 4, 7]
     assert quick_sort([1, 2, 3, 4, 7], min_size_for_insertion=2) == [1, 2, 3, 4, 7]
+
+    assert quick_sort([3, 4, 2, 7, 1], introspective=True) == [1, 2, 3, 4, 7]
+    assert quick_sort([3, 4, 2, 7, 1, 2], min_size_for_insertion=2, introspective=True) == [1, 2, 2, 3, 4, 7]
+    assert quick_sort([], introspective=True) == []
+    assert quick_sort([5, 5, 5, 1, 5, 5] * 1000, introspective=True) == [1] * 1000 + [5] * 5000
+    assert quick_sort(list(range(5000)), introspective=True) == list(range(5000))
+    assert quick_sort(list(range(5000, 0, -1)), min_size_for_insertion=16, introspective=True) == \
+        list(range(1, 5001))
+    assert quick_sort(['bb', 'a', 'ccc', 'dd'], key=len, reverse=True, stable=True) == ['ccc', 'bb', 'dd', 'a']
+    assert quick_sort(['bb', 'a', 'ccc', 'dd'], introspective=True, key=len) == ['a', 'bb', 'dd', 'ccc']
+
+    # Sorted, reversed, organ-pipe and sorted input with duplicates should never exhaust the depth budget
+    for values in [list(range(20000)), list(range(20000, 0, -1)), list(range(10000)) + list(range(10000, 0, -1)),
+                   sorted(list(range(5000)) * 4)]:
+        fallback_ranges = []
+        assert introsort(values, 0, len(values) - 1, 16, fallback_ranges) == sorted(values)
+        assert fallback_ranges == []
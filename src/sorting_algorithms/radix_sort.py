@@ -0,0 +1,158 @@
+"""
+Least significant digit (LSD) radix sort for integer and floating point values.
+Instead of comparing values, every value is mapped to an unsigned 64 bit key that sorts in the same order, and the
+keys are distributed over 2^digit_bits buckets per digit, starting at the least significant digit.
+
+- Unsigned integers are their own key
+- Signed integers get their sign bit flipped, so negative values come before positive values
+- Floats are reinterpreted as their 64 bit IEEE 754 representation. Positive floats get their sign bit flipped, for
+  negative floats all bits are flipped (larger magnitude negative floats have larger bit patterns)
+
+When NumPy is installed, NumPy arrays, array.array objects (wrapped without a copy) and numeric lists are sorted with
+vectorized counting passes. Without NumPy, lists and array.array objects fall back to bucket passes in Python.
+"""
+from array import array
+
+from src.sorting_algorithms.numeric_arrays import as_numpy, numeric_typecode
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SIGN_BIT = 1 << 63
+ALL_BITS = (1 << 64) - 1
+UNSIGNED_TYPECODES = 'BHILQ'
+FLOAT_TYPECODES = 'fd'
+
+
+def float_keys(values):
+    """Maps floats to unsigned 64 bit keys that sort in the same order as the floats"""
+    bits = array('Q')
+    bits.frombytes(array('d', values).tobytes())
+    return [bit_pattern ^ ALL_BITS if bit_pattern & SIGN_BIT else bit_pattern | SIGN_BIT for bit_pattern in bits]
+
+
+def keys_to_floats(keys):
+    """Inverse of float_keys, returns the list of floats the keys were created from"""
+    bits = array('Q', [key ^ SIGN_BIT if key & SIGN_BIT else key ^ ALL_BITS for key in keys])
+    floats = array('d')
+    floats.frombytes(bits.tobytes())
+    return floats.tolist()
+
+
+def lsd_radix_sort_keys(keys, digit_bits=8):
+    """
+    Sorts a list of unsigned 64 bit integer keys by distributing them over 2^digit_bits buckets, once for every
+    digit. Digits where all keys are equal are skipped, so small ranges of keys only need a few passes.
+
+    :param keys: list, unsigned integers lower than 2^64
+    :param digit_bits: int, number of bits per digit
+    :return: list, sorted keys
+    """
+    if len(keys) < 2:
+        return keys
+
+    differing_bits = 0
+    for key in keys:
+        differing_bits |= key ^ keys[0]
+
+    mask = (1 << digit_bits) - 1
+    for shift in range(0, 64, digit_bits):
+        if (differing_bits >> shift) & mask == 0:
+            continue
+        buckets = [[] for _ in range(mask + 1)]
+        for key in keys:
+            buckets[(key >> shift) & mask].append(key)
+        keys = [key for bucket in buckets for key in bucket]
+    return keys
+
+
+def numpy_radix_sort(values, digit_bits=8):
+    """
+    Radix sorts a one dimensional NumPy array of integers or floats in place. Every counting pass is a stable
+    argsort of the digits (which NumPy performs as a counting/radix sort for 8 and 16 bit types).
+
+    :param values: numpy.ndarray, one dimensional array with integer or float dtype
+    :param digit_bits: int, number of bits per digit, 8 or 16
+    :return: numpy.ndarray, values sorted in place
+    """
+    kind = values.dtype.kind
+    sign_bit = np.uint64(SIGN_BIT)
+    if kind == 'i':
+        keys = values.astype(np.int64).view(np.uint64) ^ sign_bit
+    elif kind == 'u':
+        keys = values.astype(np.uint64)
+    elif kind == 'f':
+        bits = values.astype(np.float64).view(np.uint64)
+        keys = np.where(bits & sign_bit, ~bits, bits | sign_bit)
+    else:
+        raise TypeError(f"Radix sort does not support arrays with dtype {values.dtype}")
+
+    if len(keys) < 2:
+        return values
+
+    differing_bits = int(np.bitwise_or.reduce(keys ^ keys[0]))
+    mask = (1 << digit_bits) - 1
+    digit_dtype = np.uint8 if digit_bits <= 8 else np.uint16
+    for shift in range(0, 64, digit_bits):
+        if (differing_bits >> shift) & mask == 0:
+            continue
+        digits = ((keys >> np.uint64(shift)) & np.uint64(mask)).astype(digit_dtype)
+        keys = keys[np.argsort(digits, kind='stable')]
+
+    if kind == 'i':
+        values[...] = (keys ^ sign_bit).view(np.int64)
+    elif kind == 'u':
+        values[...] = keys
+    else:
+        values[...] = np.where(keys & sign_bit, keys ^ sign_bit, ~keys).view(np.float64)
+    return values
+
+
+def radix_sort(values, digit_bits=8):
+    """
+    Sorts integers or floats in place with an LSD radix sort. Supports NumPy arrays, array.array objects and lists
+    with only ints (that fit in 64 bits) or only floats. With NumPy installed, all of them are sorted by
+    numpy_radix_sort: an array.array in place through a NumPy view of its buffer, a list through a NumPy copy.
+
+    :param values: Iterable with numeric values
+    :param digit_bits: int, number of bits per digit (pass), defaults to 8 (256 buckets per pass)
+    :return: Iterable with sorted values
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        return numpy_radix_sort(values, digit_bits)
+
+    typecode = numeric_typecode(values)
+    if typecode is None:
+        raise TypeError("Radix sort requires only integers (fitting in 64 bits) or only floats")
+    if len(values) < 2:
+        return values
+
+    if np is not None:
+        sorted_array = numpy_radix_sort(as_numpy(values, typecode), digit_bits)
+        if not isinstance(values, array):
+            values[:] = sorted_array.tolist()
+        return values
+
+    if typecode in FLOAT_TYPECODES:
+        sorted_values = keys_to_floats(lsd_radix_sort_keys(float_keys(values), digit_bits))
+    elif typecode in UNSIGNED_TYPECODES:
+        sorted_values = lsd_radix_sort_keys(list(values), digit_bits)
+    else:
+        keys = lsd_radix_sort_keys([value + SIGN_BIT for value in values], digit_bits)
+        sorted_values = [key - SIGN_BIT for key in keys]
+
+    values[:] = array(typecode, sorted_values) if isinstance(values, array) else sorted_values
+    return values
+
+
+if __name__ == '__main__':
+    assert radix_sort([3, 4, 2, 7, 1]) == [1, 2, 3, 4, 7]
+    assert radix_sort([3, -4, 2, -7, 1, 2]) == [-7, -4, 1, 2, 2, 3]
+    assert radix_sort([2 ** 62, -2 ** 63, 0]) == [-2 ** 63, 0, 2 ** 62]
+    assert radix_sort([0.5, -1.5, 3.25, -0.25, 0.0]) == [-1.5, -0.25, 0.0, 0.5, 3.25]
+    assert radix_sort(array('i', [3, -4, 2])) == array('i', [-4, 2, 3])
+    assert radix_sort(array('B', [3, 255, 2])) == array('B', [2, 3, 255])
+    assert radix_sort(array('f', [0.5, -2.0, 1.0])) == array('f', [-2.0, 0.5, 1.0])
+    assert radix_sort([]) == []
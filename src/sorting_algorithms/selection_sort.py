@@ -1,3 +1,6 @@
+from src.sorting_algorithms.key_sort import sort_by_key
+
+
 def find_max_value_index(values, lower_index, upper_index):
     """
     Finds and returns the index of the maximum value in an Iterable, given the lower_index and upper_index bounds
@@ -11,14 +14,21 @@ def find_max_value_index(values, lower_index, upper_index):
     return max_index
 
 
-def selection_sort(values):
+def selection_sort(values, key=None, reverse=False, stable=False):
     """
     Sorts the values in an Iterable with an implemented gt function by finding the index of the maximum value
     in the iterable and moving that value to the last index of the iterable. In the next round, the last index is not
     considered, and the next maximum value is moved to the second to last index, etc.
 
-    :return:Sorted values
+    :param values: Iterable with values to be sorted. Expected to have a gt function implemented
+    :param key: Function, if given values are sorted by key(value), keys are computed once per value
+    :param reverse: bool, sort in descending order
+    :param stable: bool, keep the original order of equal values, also in reverse, see key_sort.sort_by_key
+    :return: Sorted values
     """
+    if key is not None or reverse or stable:
+        return sort_by_key(selection_sort, values, key, reverse, stable)
+
     for i in range(len(values) - 1, -1, -1):
         max_index = find_max_value_index(values, 0, i)
         if max_index != i:
@@ -31,3 +41,4 @@ def selection_sort(values):
 if __name__ == '__main__':
     assert selection_sort([3, 2, 1]) == [1, 2, 3]
     assert selection_sort([1, 2, 3]) == [1, 2, 3]
+    assert selection_sort([-3, 1, 2], key=abs) == [1, 2, -3]
@@ -0,0 +1,59 @@
+"""
+Common entry point for the sorting algorithms in this package.
+"""
+from src.sorting_algorithms.adaptive_sort import adaptive_sort
+from src.sorting_algorithms.bucket_sort import bucket_sort
+from src.sorting_algorithms.heap_sort import heap_sort
+from src.sorting_algorithms.insertion_sort import insertion_sort
+from src.sorting_algorithms.quick_sort import quick_sort
+from src.sorting_algorithms.radix_sort import radix_sort
+from src.sorting_algorithms.selection_sort import selection_sort
+
+
+def introspective_quick_sort(values, **options):
+    """quick_sort with introsort and insertion sort for small ranges by default, options can override both"""
+    options.setdefault('min_size_for_insertion', 16)
+    options.setdefault('introspective', True)
+    return quick_sort(values, **options)
+
+
+SORT_ALGORITHMS = {
+    'adaptive': adaptive_sort,
+    'quick': introspective_quick_sort,
+    'heap': heap_sort,
+    'insertion': insertion_sort,
+    'selection': selection_sort,
+    'radix': radix_sort,
+    'bucket': bucket_sort,
+}
+
+
+def sort(values, algorithm='adaptive', **options):
+    """
+    Sorts values in place with the chosen algorithm.
+
+    :param values: Iterable with values, should have gt/lt functions implemented for values. The radix and bucket
+        algorithms require integers or floats (lists, array.array or NumPy arrays)
+    :param algorithm: str, one of the keys in SORT_ALGORITHMS, defaults to 'adaptive', which picks a
+        strategy from the existing order in the values (pass return_strategy=True to get the chosen strategy)
+    :param options: keyword arguments passed on to the algorithm, e.g. key, reverse and stable for the comparison sorts
+    :return: Iterable with sorted values
+    """
+    if algorithm not in SORT_ALGORITHMS:
+        raise ValueError(f"Unknown sorting algorithm '{algorithm}', choose from {list(SORT_ALGORITHMS.keys())}")
+    return SORT_ALGORITHMS[algorithm](values, **options)
+
+
+if __name__ == '__main__':
+    for name in SORT_ALGORITHMS.keys():
+        assert sort([3, 4, 2, 7, 1, 2], algorithm=name) == [1, 2, 2, 3, 4, 7]
+    for name in ['adaptive', 'quick', 'heap', 'insertion', 'selection']:
+        assert sort(['bb', 'a', 'ccc', 'dd'], algorithm=name, key=len, reverse=True, stable=True) == \
+            ['ccc', 'bb', 'dd', 'a']
+        # 1.0, 1 and True are equal, stable=True on its own keeps them in their input order
+        equal_values = [True, 2, 1.0, 0, 1] * 20
+        assert [type(value) for value in sort(list(equal_values), algorithm=name, stable=True)] == \
+            [int] * 20 + [bool, float, int] * 20 + [int] * 20
+    assert sort(list(range(100)) + [5], return_strategy=True) == (sorted(list(range(100)) + [5]), 'merge')
+    assert sort([3, 4, 2, 7, 1], 'quick', min_size_for_insertion=4) == [1, 2, 3, 4, 7]
+    assert sort([3, 4, 2, 7, 1], 'quick', introspective=False) == [1, 2, 3, 4, 7]
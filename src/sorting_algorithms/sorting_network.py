@@ -0,0 +1,114 @@
+"""
+Batched sorting of many small rows with sorting networks.
+A sorting network is a fixed sequence of compare-exchange operations on pairs of positions that sorts any input of a
+given size. Because the sequence does not depend on the data, the same comparator can be applied to all rows of a
+2D NumPy array at once. Comparators are grouped in layers of independent pairs, so every layer is one vectorized
+compare-exchange over the rows.
+
+The networks are Batcher's odd-even merge sort networks, O(n log^2 n) comparators in O(log^2 n) layers.
+"""
+from functools import lru_cache
+
+from src.sorting_algorithms.insertion_sort import insertion_sort
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@lru_cache(maxsize=None)
+def sorting_network(n):
+    """
+    Batcher's odd-even merge sort network for n inputs, comparators reaching beyond index n - 1 are left out (those
+    would compare with virtual +inf values, which never moves a value).
+
+    :param n: int, number of inputs
+    :return: tuple of layers, every layer is a tuple of (i, j) index pairs with i < j that can be applied in parallel
+    """
+    layers = []
+    p = 1
+    while p < n:
+        k = p
+        while k >= 1:
+            layer = []
+            for j in range(k % p, n - k, 2 * k):
+                for i in range(min(k, n - j - k)):
+                    if (i + j) // (2 * p) == (i + j + k) // (2 * p):
+                        layer.append((i + j, i + j + k))
+            if layer:
+                layers.append(tuple(layer))
+            k //= 2
+        p *= 2
+    return tuple(layers)
+
+
+@lru_cache(maxsize=None)
+def numpy_layers(n):
+    """The layers of sorting_network(n) as pairs of NumPy index arrays"""
+    return tuple((np.array([i for i, _ in layer]), np.array([j for _, j in layer])) for layer in sorting_network(n))
+
+
+def apply_network(row):
+    """Sorts a single row (list) in place by applying the sorting network for its length"""
+    for layer in sorting_network(len(row)):
+        for i, j in layer:
+            if row[j] < row[i]:
+                row[i], row[j] = row[j], row[i]
+    return row
+
+
+def batch_sort(matrix):
+    """
+    Sorts every row of matrix in place.
+
+    Numeric 2D NumPy arrays are sorted with the sorting network for the row width, one vectorized compare-exchange
+    per layer for all rows at once. Values are swapped with a mask instead of np.minimum/np.maximum, which would copy
+    a NaN into both positions; NaN is treated as larger than all other values, so it ends up last as with np.sort.
+    Rows of different lengths should be padded with a sentinel that is larger than all values (e.g. inf or the maximum
+    of the dtype), so the padding ends up at the end of every row.
+    Object arrays and lists of lists are sorted row by row with insertion_sort.
+
+    :param matrix: 2D NumPy array, or Iterable with rows
+    :return: matrix with sorted rows
+    """
+    if np is not None and isinstance(matrix, np.ndarray) and matrix.dtype.kind in 'biuf':
+        if matrix.ndim != 2:
+            raise ValueError(f"batch_sort expects a 2D array, got {matrix.ndim} dimensions")
+        for lower, upper in numpy_layers(matrix.shape[1]):
+            lower_values = matrix[:, lower]
+            upper_values = matrix[:, upper]
+            swap = upper_values < lower_values
+            if matrix.dtype.kind == 'f':
+                swap |= np.isnan(lower_values) & ~np.isnan(upper_values)
+            matrix[:, lower] = np.where(swap, upper_values, lower_values)
+            matrix[:, upper] = np.where(swap, lower_values, upper_values)
+        return matrix
+
+    for i in range(len(matrix)):
+        matrix[i] = insertion_sort(matrix[i])
+    return matrix
+
+
+if __name__ == '__main__':
+    import itertools
+    import random
+
+    for size in range(0, 13):
+        for bits in itertools.product([0, 1], repeat=size):
+            assert apply_network(list(bits)) == sorted(bits)
+
+    for size in (17, 32, 33):
+        random_row = [random.random() for _ in range(size)]
+        assert apply_network(list(random_row)) == sorted(random_row)
+
+    assert batch_sort([[3, 1, 2], ['b', 'a']]) == [[1, 2, 3], ['a', 'b']]
+
+    if np is not None:
+        generator = np.random.default_rng(1)
+        for width in (1, 2, 7, 16, 33):
+            int_matrix = generator.integers(-50, 50, size=(200, width))
+            assert np.array_equal(batch_sort(int_matrix.copy()), np.sort(int_matrix, axis=1))
+            float_matrix = generator.random((200, width))
+            float_matrix[generator.random((200, width)) < 0.1] = np.nan
+            assert np.array_equal(batch_sort(float_matrix.copy()), np.sort(float_matrix, axis=1), equal_nan=True)